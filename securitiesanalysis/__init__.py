@@ -8,7 +8,7 @@ stocks. The analysis is based on daily closing prices and is designed to be
 executed after market close via a cron job or equivalent scheduler.  All
 configuration parameters are specified in the options.json file located in the
 installation folder under the data subdirectory.  The package utilizes NumPy,
-Pandas, Requests, Scikit-learn, SciPy, and XlsxWriter.
+Pandas, Requests, SciPy, and XlsxWriter.
 
 Routine Listings
 ----------------
@@ -37,11 +37,34 @@ Copyright (C) 2024 John Sonsini.  All rights reserved.  Source code available
 under the AGPLv3.
 
 """
-from . import __main__ as main
-
 __all__ = [
     "history_update",
     "securities_analysis",
     "regex_webscraper",
     "utilities"
 ]
+
+
+def __getattr__(name):
+    """
+    Loads the command line entry point module on first access.
+
+    Defers importing the __main__ module, along with the analysis and history
+    update modules it depends on, until the main attribute is requested so
+    that importing the package alone remains lightweight.
+
+    Parameters
+    ----------
+    name : str
+        Attribute requested from the package.
+
+    Returns
+    -------
+    obj
+        The __main__ module when main is requested.
+
+    """
+    if name == "main":
+        from . import __main__ as main
+        return main
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
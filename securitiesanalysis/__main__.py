@@ -8,7 +8,7 @@ stocks. The analysis is based on daily closing prices and is designed to be
 executed after market close via a cron job or equivalent scheduler.  All
 configuration parameters are specified in the options.json file located in the
 installation folder under the data subdirectory.  The package utilizes NumPy,
-Pandas, Requests, Scikit-learn, SciPy, and XlsxWriter.
+Pandas, Requests, SciPy, and XlsxWriter.
 
 Notes
 -----
@@ -25,18 +25,20 @@ Copyright (C) 2024 John Sonsini.  All rights reserved.  Source code available
 under the AGPLv3.
 
 """
-import codecs
 import datetime
+import functools
 import json
 import os
 import sys
 
-import pandas_market_calendars
-
 import securitiesanalysis.history_update
 import securitiesanalysis.securities_analysis
 import securitiesanalysis.utilities
 
+OPTIONS_PATH = os.path.join(os.path.abspath(os.path.dirname(__file__)), "data",
+                            "options.json")
+"""str: Location of the options file in the installation directory."""
+
 
 def load_options():
     """
@@ -53,15 +55,54 @@ def load_options():
         Folder containing all relevant subdirectories.
 
     """
-    root = os.path.abspath(os.path.dirname(__file__))
-    with codecs.open(os.path.join(root, "data", "options.json"), "r",
-                     "utf-8") as options_file:
-        options = json.loads(options_file.read())
+    root = os.path.dirname(os.path.dirname(OPTIONS_PATH))
+    with open(OPTIONS_PATH, "r", encoding="utf-8") as options_file:
+        options = json.load(options_file)
     return options, root
-    # with codecs.open("/home/john/data_backup/options.json", "r",
-    #                  "utf-8") as options_file:
-    #     options = json.loads(options_file.read())
-    # return options, ""
+
+
+@functools.lru_cache(maxsize=1)
+def get_calendar():
+    """
+    Loads the New York Stock Exchange trading calendar.
+
+    Builds the exchange calendar once and caches it for any subsequent
+    trading day checks.
+
+    Returns
+    -------
+    obj
+        Trading calendar for the New York Stock Exchange.
+
+    """
+    # Deferred so the package can be imported without loading the calendars
+    import pandas_market_calendars
+    return pandas_market_calendars.get_calendar("NYSE")
+
+
+def is_trading_day(day):
+    """
+    Determines whether the markets are open on the passed in date.
+
+    Weekends are rejected immediately, otherwise the cached New York Stock
+    Exchange calendar is checked for a valid trading session on the given day.
+
+    Parameters
+    ----------
+    day : date
+        Date to be checked against the trading calendar.
+
+    Returns
+    -------
+    boolean
+        Indicates whether the date is a trading day.
+
+    """
+    # Skip building the calendar schedule for Saturdays and Sundays
+    if 4 < day.weekday():
+        return False
+    d = day.isoformat()
+    return not get_calendar().valid_days(start_date=d, end_date=d).empty
 
 
 def main():
@@ -73,20 +114,15 @@ def main():
 
     """
     # Check to determine if current date is a trading day
-    calendar = pandas_market_calendars.get_calendar("NYSE")
-    is_trading_day = not calendar.valid_days(
-        start_date=datetime.date.today().strftime("%Y-%m-%d"),
-        end_date=datetime.date.today().strftime("%Y-%m-%d")).empty
-    if not is_trading_day:
+    if not is_trading_day(datetime.date.today()):
         sys.exit(0)
-    options, root = load_options()
+    options, _ = load_options()
     h = securitiesanalysis.history_update.HistoryUpdate(options)
     # Update the security histories
     h.execute()
     # Update the options file with the most recent split information
-    with codecs.open(os.path.join(root, "data", "options.json"), "w",
-                     "utf-8") as options_file:
-        options_file.write(json.dumps(h.options, indent=4, sort_keys=True))
+    with open(OPTIONS_PATH, "w", encoding="utf-8") as options_file:
+        json.dump(h.options, options_file, indent=4, sort_keys=True)
     s = securitiesanalysis.securities_analysis.SecuritiesAnalysis(
         h.root_path, h.options, h.data, h.message_list, h.log_date, h.logger)
     # Perform the regression analysis and save the results
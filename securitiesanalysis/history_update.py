@@ -26,14 +26,14 @@ Copyright (C) 2024 John Sonsini.  All rights reserved.  Source code available
 under the AGPLv3.
 
 """
-import codecs
 import datetime
 import logging.config
 import multiprocessing
+import multiprocessing.pool
 import os
 import string
-import sys
 
+import numpy
 import pandas
 import requests.packages
 
@@ -41,6 +41,44 @@ import securitiesanalysis.regex_webscraper
 import securitiesanalysis.utilities
 
 
+def parse_split(text):
+    """
+    Converts a split stored in the options file into its key.
+
+    Parameters
+    ----------
+    text : str
+        Symbol, before and after number of shares, and date of the split as a
+        year fraction separated by spaces.
+
+    Returns
+    -------
+    tuple
+        Symbol followed by the numeric before shares, after shares, and date.
+
+    """
+    symbol, before, after, split_date = text.split()
+    return symbol, float(before), float(after), float(split_date)
+
+
+def format_split(split):
+    """
+    Converts a split key into the text stored in the options file.
+
+    Parameters
+    ----------
+    split : tuple
+        Symbol followed by the numeric before shares, after shares, and date.
+
+    Returns
+    -------
+    str
+        Values of the key separated by spaces, read back by parse_split.
+
+    """
+    return "%s %s %s %s" % split
+
+
 class HistoryUpdate(object):
     """
     Retrieves daily closing price and metadata for securities.
@@ -80,6 +118,10 @@ class HistoryUpdate(object):
         """str: Folder containing security history files."""
         self.__report_path = os.path.join(self.__root_path, "reports")
         """str: Folder containing all output directories and files."""
+        self.__data_path = os.path.join(self.__report_path, "data")
+        """str: Folder containing daily collected data files."""
+        self.__summary_path = os.path.join(self.__report_path, "summary")
+        """str: Folder containing summary workbooks."""
         self.__log_date = datetime.date.today()
         """date: Day of execution."""
         logging.config.dictConfig(self.__options["logging_config"])
@@ -88,10 +130,24 @@ class HistoryUpdate(object):
         self.__message_list = ["market summary for %s" % str(self.__log_date),
                                ""]
         """obj: List of messages to be included in body of summary email."""
-        self.__applied_split_set = set(self.__options["applied_split_set"])
+        # Split keys are stored as joined strings in the options file and
+        # parsed into symbol and numeric values for direct comparison
+        self.__applied_split_set = {
+            parse_split(a) for a in self.__options["applied_split_set"]}
         """set: Collection of previous splits applied to history files."""
         self.__data = None
         """obj: All closing prices and metadata for each symbol."""
+        self.__scrapers = dict()
+        """dictionary: Metadata and split web scrapers keyed by source."""
+        # Stocks do not belong to any family and should not be grouped with
+        # mutual funds and exchange traded funds marked "UNKNOWN"
+        self.__metadata_dict = {
+            "fund": lambda s: self.__get_fund_total_assets_category(s) + (
+                self.__get_fund_family(s),),
+            "etf": self.__get_etf_total_assets_category_family,
+            "stock": lambda s: self.__get_stock_total_assets_category(s) + (
+                None,)}
+        """dictionary: Metadata collection method keyed by security type."""
         requests.packages.urllib3.disable_warnings(
             requests.packages.urllib3.exceptions.InsecureRequestWarning)
 
@@ -109,21 +165,13 @@ class HistoryUpdate(object):
 
         """
         try:
-            if not os.path.exists(self.__root_path):
-                os.makedirs(self.__root_path)
-            if not os.path.exists(self.__log_path):
-                os.makedirs(self.__log_path)
-            if not os.path.exists(self.__history_path):
-                os.makedirs(self.__history_path)
-            if not os.path.exists(self.__report_path):
-                os.makedirs(self.__report_path)
-            if not os.path.exists(os.path.join(self.__report_path, "data")):
-                os.makedirs(os.path.join(self.__report_path, "data"))
-            if not os.path.exists(os.path.join(self.__report_path, "summary")):
-                os.makedirs(os.path.join(self.__report_path, "summary"))
-        except:
+            for path in (self.__root_path, self.__log_path,
+                         self.__history_path, self.__report_path,
+                         self.__data_path, self.__summary_path):
+                os.makedirs(path, exist_ok=True)
+        except Exception as e:
             print("initialize directories error %s"
-                  % securitiesanalysis.utilities.format_error(sys.exc_info()))
+                  % securitiesanalysis.utilities.format_error(e))
             return False
         else:
             return True
@@ -133,12 +181,80 @@ class HistoryUpdate(object):
         Sets up regular expression based web scraping utility.
 
         Configures the reusable web scraper with default parameters common to
-        all subsequent usage.
+        all subsequent usage and compiles a dedicated scraper for the metadata
+        and split sources so that no patterns are rebound during processing.
 
         """
         type(self)._scraper.timeout = self.__options["timeout_period"]
         type(self)._scraper.delay_time = self.__options["delay_time"]
+        type(self)._scraper.max_delay_time = self.__options["max_delay_time"]
+        type(self)._scraper.max_retry_time = self.__options["max_retry_time"]
         type(self)._scraper.max_retries = self.__options["max_retry_count"]
+        type(self)._scraper.pattern_list = [self.__options["history_pattern"]]
+        type(self)._scraper.findall = True
+        type(self)._scraper.groups = None
+        # Each metadata source gets a dedicated scraper so that concurrent
+        # threads never modify the patterns of a shared instance
+        pattern_dict = {
+            "fund": ["fund_assets_pattern", "fund_category_pattern"],
+            "fund_family": ["fund_family_pattern"],
+            "etf": ["etf_assets_pattern", "etf_family_pattern",
+                    "etf_category_pattern"],
+            "stock": ["stock_assets_pattern", "stock_category_pattern"]}
+        self.__scrapers = {
+            k: securitiesanalysis.regex_webscraper.RegexWebScraper(
+                [self.__options[o] for o in v],
+                self.__options["timeout_period"],
+                self.__options["delay_time"],
+                self.__options["max_retry_count"], groups=(1,),
+                pool_size=self.__options["metadata_pool_size"],
+                max_delay_time=self.__options["max_delay_time"],
+                max_retry_time=self.__options["max_retry_time"])
+            for k, v in pattern_dict.items()}
+        self.__scrapers["split"] = \
+            securitiesanalysis.regex_webscraper.RegexWebScraper(
+                [self.__options["split_pattern"]],
+                self.__options["timeout_period"],
+                self.__options["delay_time"],
+                self.__options["max_retry_count"], findall=True,
+                max_delay_time=self.__options["max_delay_time"],
+                max_retry_time=self.__options["max_retry_time"])
+
+    def __map_category(self, c, symbol):
+        """
+        Converts scraped category into the standardized category set.
+
+        Treats missing or placeholder values as unknown and looks up the
+        mapped category value.  If the category value is not in the mapping
+        then a warning message is included in the email body with the results
+        so that the options file can be manually updated.
+
+        Parameters
+        ----------
+        c : str
+            Category text extracted from the online source.
+        symbol : str
+            Ticker symbol representing security.
+
+        Returns
+        -------
+        str
+            Standardized category defined in the options file, "UNKNOWN" if
+            not available.
+
+        """
+        if not c or not c.strip() or c in ("-", "--"):
+            c = "UNKNOWN"
+        # To ensure later aggregations include all member securities map the
+        # collected category to a standardized set in the configuration file
+        if c in self.__options["category_mapping"]:
+            c = self.__options["category_mapping"][c]
+        else:
+            self.__logger.warning("warning - unmapped category of %s for %s",
+                                  c, symbol)
+            self.__message_list.append(
+                "warning - unmapped category of %s for %s" % (c, symbol))
+        return c
 
     def __get_fund_total_assets_category(self, symbol):
         """
@@ -167,43 +283,21 @@ class HistoryUpdate(object):
 
         """
         p = multiprocessing.current_process().name
-        self.__logger.info(
-            "get fund total assets and category for %s %s" % (symbol, p))
+        self.__logger.info("get fund total assets and category for %s %s",
+                           symbol, p)
+        c = None
         try:
-            matches = type(self)._scraper.scrape(
+            matches = self.__scrapers["fund"].scrape(
                 self.__options["fund_total_assets_category_prefix_URL"]
                 % symbol)
             a, c = matches[0], matches[1]
-            # Multiply by the correct order of magnitude based on the trailing
-            # character
-            if a[-1] == "K":
-                a = int(1000 * float(a[:-1]))
-            elif a[-1] == "M":
-                a = int(1000000 * float(a[:-1]))
-            elif a[-1] == "B":
-                a = int(1000000000 * float(a[:-1]))
-            elif a[-1] == "T":
-                a = int(1000000000000 * float(a[:-1]))
-            else:
-                a = -1
+            a = securitiesanalysis.utilities.get_assets(a)
         except:
             a = -1
-        try:
-            c = "UNKNOWN" if not c or c == "--" else c
-            # To ensure later aggregations include all member securities map
-            # the collected category to a standardized set in the configuration
-            # file
-            if c in self.__options["category_mapping"]:
-                c = self.__options["category_mapping"][c]
-            else:
-                self.__logger.warning("warning - unmapped category of %s for %s"
-                                      % (c, symbol))
-                self.__message_list.append(
-                    "warning - unmapped category of %s for %s" % (c, symbol))
-        except:
-            c = "UNKNOWN"
-        self.__logger.info("got fund total assets and category for %s %s %s %s"
-                           % (symbol, a, c, p))
+        c = self.__map_category(c, symbol)
+        self.__logger.info(
+            "got fund total assets and category for %s %s %s %s",
+            symbol, a, c, p)
         return a, c
 
     def __get_fund_family(self, symbol):
@@ -225,19 +319,19 @@ class HistoryUpdate(object):
 
         """
         p = multiprocessing.current_process().name
-        self.__logger.info("get fund family for %s %s" % (symbol, p))
+        self.__logger.info("get fund family for %s %s", symbol, p)
         try:
-            matches = type(self)._scraper.scrape(
+            matches = self.__scrapers["fund_family"].scrape(
                 self.__options["fund_family_prefix_URL"] % symbol)
             f = matches[0] if matches[0] else "UNKNOWN"
         except:
             f = "UNKNOWN"
-        self.__logger.info("got fund family for %s %s %s" % (symbol, f, p))
+        self.__logger.info("got fund family for %s %s %s", symbol, f, p)
         return f
 
-    def __get_etf_total_assets_family_category(self, symbol):
+    def __get_etf_total_assets_category_family(self, symbol):
         """
-        Retrieves assets, family, and category from configured online source.
+        Retrieves assets, category, and family from configured online source.
 
         Downloads and extracts asset, family, and category information for
         passed ticker symbol, finding the mapped category value.  If the
@@ -254,56 +348,33 @@ class HistoryUpdate(object):
         -------
         a : int
             Net Assets for the fund.
-        f : str
-            Investment firm managing the fund.
         c : str
             Sector or grouping ticker symbol belongs to, standard mapping is
             defined in the options file such that any unmapped categories
             encountered will be added to a message list and included in the
             subsequent email for the summary.
+        f : str
+            Investment firm managing the fund.
 
         """
         p = multiprocessing.current_process().name
-        self.__logger.info(
-            "get etf assets, family, and category for %s %s " % (symbol, p))
+        self.__logger.info("get etf assets, family, and category for %s %s ",
+                           symbol, p)
+        c = None
         try:
-            matches = type(self)._scraper.scrape(
+            matches = self.__scrapers["etf"].scrape(
                 "%s%s" % (self.__options["etf_prefix_URL"], symbol))
             a, f, c = matches[0], matches[1], matches[2]
-            # Multiply by the correct order of magnitude based on the trailing
-            # character
-            if a[-1] == "K":
-                a = int(1000 * float(a[:-1]))
-            elif a[-1] == "M":
-                a = int(1000000 * float(a[:-1]))
-            elif a[-1] == "B":
-                a = int(1000000000 * float(a[:-1]))
-            elif a[-1] == "T":
-                a = int(1000000000000 * float(a[:-1]))
-            else:
-                a = -1
+            a = securitiesanalysis.utilities.get_assets(a)
             f = "UNKNOWN" if not f or not f.strip() else f
         except:
             a = -1
             f = "UNKNOWN"
-        try:
-            c = "UNKNOWN" if not c or not c.strip() or c == "--" else c
-            # To ensure later aggregations include all member securities map
-            # the collected category to a standardized set in the configuration
-            # file
-            if c in self.__options["category_mapping"]:
-                c = self.__options["category_mapping"][c]
-            else:
-                self.__logger.warning("warning - unmapped category of %s for %s"
-                                      % (c, symbol))
-                self.__message_list.append(
-                    "warning - unmapped category of %s for %s" % (c, symbol))
-        except:
-            c = "UNKNOWN"
+        c = self.__map_category(c, symbol)
         self.__logger.info(
-            "got etf assets, family, and category for %s %s %s %s %s"
-            % (symbol, a, f, c, p))
-        return a, f, c
+            "got etf assets, family, and category for %s %s %s %s %s",
+            symbol, a, f, c, p)
+        return a, c, f
 
     def __get_stock_total_assets_category(self, symbol):
         """
@@ -332,31 +403,19 @@ class HistoryUpdate(object):
 
         """
         p = multiprocessing.current_process().name
-        self.__logger.info("get stock assets and category for %s %s"
-                           % (symbol, p))
+        self.__logger.info("get stock assets and category for %s %s",
+                           symbol, p)
+        c = None
         try:
-            matches = type(self)._scraper.scrape(
+            matches = self.__scrapers["stock"].scrape(
                 self.__options["stock_prefix_URL"] % symbol)
             a, c = matches[0], matches[1]
             a = int(a.replace(",", ""))
         except:
             a = -1
-        try:
-            c = "UNKNOWN" if not c or c == "-" else c
-            # To ensure later aggregations include all member securities map
-            # the collected category to a standardized set in the configuration
-            # file
-            if c in self.__options["category_mapping"]:
-                c = self.__options["category_mapping"][c]
-            else:
-                self.__logger.warning("warning - unmapped category of %s for %s"
-                                      % (c, symbol))
-                self.__message_list.append(
-                    "warning - unmapped category of %s for %s" % (c, symbol))
-        except:
-            c = "UNKNOWN"
-        self.__logger.info("got stock assets and category for %s %s %s %s"
-                           % (symbol, a, c, p))
+        c = self.__map_category(c, symbol)
+        self.__logger.info("got stock assets and category for %s %s %s %s",
+                           symbol, a, c, p)
         return a, c
 
     def get_metadata(self, symbol_tuple):
@@ -364,7 +423,7 @@ class HistoryUpdate(object):
         Retrieves daily closing price and metadata for each security.
 
         Based on ticker symbol and security type, this function collects the
-        net assets or market capitalization, cap, category, and family.
+        net assets or market capitalization, category, and family.
 
         Parameters
         ----------
@@ -376,9 +435,6 @@ class HistoryUpdate(object):
         assets : float
             Net assets for mutual funds and exchange traded funds, market
             capitalization for stocks.
-        cap : str
-            "large", "mid", or "small" defined by greater than $10B, between $2B
-            and $10B, and less than $2B.
         category : str
             Sector or grouping ticker symbol belongs to.
         family : str
@@ -388,66 +444,30 @@ class HistoryUpdate(object):
         """
         p = multiprocessing.current_process().name
         symbol, security_type = symbol_tuple
-        self.__logger.info(
-            "get metadata for %s %s %s" % (symbol, security_type, p))
+        self.__logger.info("get metadata for %s %s %s",
+                           symbol, security_type, p)
         # Provide default values in case security metadata fields are not
         # available
-        assets, cap, category, family = -1, "UNKNOWN", "UNKNOWN", "UNKNOWN"
+        assets, category, family = -1, "UNKNOWN", "UNKNOWN"
         # Based on security type collect the appropriate metadata
-        if security_type == "fund":
-            # Update the regular expression patterns and attributes to collect
-            self._scraper.pattern_list = [
-                self.__options["fund_assets_pattern"],
-                self.__options["fund_category_pattern"]]
-            self._scraper.findall = False
-            self._scraper.groups = (1,)
-            assets, category = self.__get_fund_total_assets_category(
-                symbol)
-            cap = securitiesanalysis.utilities.get_cap(assets)
-            self._scraper.pattern_list = [
-                self.__options["fund_family_pattern"]]
-            family = self.__get_fund_family(symbol)
-        elif security_type == "etf":
-            # Update the regular expression patterns and attributes to collect
-            self._scraper.pattern_list = [
-                self.__options["etf_assets_pattern"],
-                self.__options["etf_family_pattern"],
-                self.__options["etf_category_pattern"]]
-            self._scraper.findall = False
-            self._scraper.groups = (1,)
-            assets, family, category = \
-                self.__get_etf_total_assets_family_category(symbol)
-            cap = securitiesanalysis.utilities.get_cap(assets)
-        elif security_type == "stock":
-            # Update the regular expression patterns and attributes to collect
-            self._scraper.pattern_list = [
-                self.__options["stock_assets_pattern"],
-                self.__options["stock_category_pattern"]]
-            self._scraper.findall = False
-            self._scraper.groups = (1,)
-            assets, category = self.__get_stock_total_assets_category(symbol)
-            cap = securitiesanalysis.utilities.get_cap(assets)
-            # Stocks do not belong to any family and should not be grouped with
-            # mutual funds and exchange traded funds marked "UNKNOWN"
-            family = None
+        if security_type in self.__metadata_dict:
+            assets, category, family = \
+                self.__metadata_dict[security_type](symbol)
         else:
-            self.__logger.error(
-                "get metadata unknown type %s for %s %s" % (security_type,
-                                                            symbol, p))
-        self.__logger.info(
-            "got metadata for %s %s %s %s %s %s %s" % (symbol, security_type,
-                                                       assets, cap, category,
-                                                       family, p))
-        return assets, cap, category, family
+            self.__logger.error("get metadata unknown type %s for %s %s",
+                                security_type, symbol, p)
+        self.__logger.info("got metadata for %s %s %s %s %s %s", symbol,
+                           security_type, assets, category, family, p)
+        return assets, category, family
 
     def scrape_eod(self, eod_url, initial_type):
         """
-        Retrieves daily closing price and metadata for list extracted from URL.
+        Retrieves daily closing price for list extracted from URL.
 
-        Creates process pool to collect daily closing prices and metadata for all
-        extracted ticker symbols from the provided URL.  Should an exception be
-        thrown during processing an empty dataframe with the correct columns will
-        be returned.
+        Collects ticker symbols, titles, and daily closing prices for all
+        securities listed on the provided URL.  Should an exception be thrown
+        during processing an empty dataframe with the correct columns will be
+        returned.
 
         Parameters
         ----------
@@ -459,52 +479,37 @@ class HistoryUpdate(object):
         Returns
         -------
         obj
-            Columnar format containing ticker symbols, daily closing prices,
-            titles, and all metadata for every security scraped from the URL.
+            Columnar format containing ticker symbols, security types, titles,
+            and daily closing prices for every security scraped from the URL.
 
         """
         p = multiprocessing.current_process().name
         try:
-            self.__logger.info("scrape eod %s %s" % (eod_url, p))
+            self.__logger.info("scrape eod %s %s", eod_url, p)
             # Collect data matching the configured regular expressions from the
             # passed in web page
             data = self._scraper.scrape(eod_url)
-            symbols = [d[0] for d in data[0]]
-            titles = [d[1] for d in data[0]]
-            # Remove commas from prices so data can be treated as numeric
-            prices = [d[2].replace(",", "") for d in data[0]]
-            security_types = [initial_type for d in data[0]]
-            # Create a concurrent process pool to execute the scraping in
-            # parallel
-            with securitiesanalysis.utilities.NonDaemonicPool(
-                    processes=self.__options["metadata_pool_size"]) as pool:
-                metadata = pool.starmap(
-                    self.get_metadata,
-                    [(s,) for s in zip(symbols, security_types)])
-            # Separate the metadata by field for insertion into a dataframe
-            assets = [m[0] for m in metadata]
-            cap = [m[1] for m in metadata]
-            categories = [m[2] for m in metadata]
-            families = [m[3] for m in metadata]
-            self.__logger.info("scraped eod %s %s" % (eod_url, p))
-        except:
-            self.__logger.error(
-                "scrape eod generic error for %s %s %s"
-                % (eod_url,
-                   securitiesanalysis.utilities.format_error(sys.exc_info()),
-                   p))
+            eod = pandas.DataFrame(list(data[0]),
+                                   columns=["symbol", "title", "price"])
+            eod.set_index("symbol", inplace=True)
+            eod.index.name = None
+            eod.insert(0, "type", initial_type)
+            # Remove commas from prices and parse them as floating point
+            # values in a single pass
+            eod["price"] = pandas.to_numeric(
+                eod["price"].str.replace(",", "", regex=False),
+                errors="coerce")
+            self.__logger.info("scraped eod %s %s", eod_url, p)
+        except Exception as e:
+            self.__logger.error("scrape eod generic error for %s %s %s",
+                                eod_url,
+                                securitiesanalysis.utilities.format_error(e),
+                                p)
             return pandas.DataFrame(index=list(),
                                     data={"type": list(), "title": list(),
-                                          "price": list(), "assets": list(),
-                                          "cap": list(), "category": list(),
-                                          "family": list()})
+                                          "price": list()})
         else:
-            return pandas.DataFrame(index=symbols,
-                                    data={"type": security_types,
-                                          "title": titles, "price": prices,
-                                          "assets": assets, "cap": cap,
-                                          "category": categories,
-                                          "family": families})
+            return eod
 
     def get_security_data(self):
         """
@@ -514,7 +519,7 @@ class HistoryUpdate(object):
         every security extracted from the lists of ticker symbols and stored
         in a dataframe.  Duplicate symbols are removed from the dataframe
         based on security type with precedence in order of etf, fund, and
-        stock.
+        stock before any metadata is collected.
 
         Returns
         -------
@@ -523,22 +528,19 @@ class HistoryUpdate(object):
 
         """
         p = multiprocessing.current_process().name
-        self.__logger.info("get security data %s" % p)
-        results_list = list()
-        # Loop over the configured dictionary of security lists
-        for k in sorted(self.__options["eod_URL_dict"].keys()):
-            type(self)._scraper.pattern_list = [
-                self.__options["history_pattern"]]
-            type(self)._scraper.findall = True
-            # Create a concurrent process pool to execute the scraping of
-            # symbol lists starting with each letter of the alphabet in
-            # parallel
-            with securitiesanalysis.utilities.NonDaemonicPool(
-                    processes=self.__options["eod_pool_size"]) as pool:
-                results_list.extend(pool.starmap(
-                    self.scrape_eod,
-                    [(k % letter, self.__options["eod_URL_dict"][k])
-                     for letter in string.ascii_uppercase]))
+        self.__logger.info("get security data %s", p)
+        # Create a single concurrent thread pool to execute the scraping of
+        # symbol lists starting with each letter of the alphabet in parallel
+        # across all of the configured security lists, the scraper settings
+        # are not modified while the pool is running and the work is bound by
+        # network latency so threads avoid the process creation and pickling
+        with multiprocessing.pool.ThreadPool(
+                processes=self.__options["eod_pool_size"]) as pool:
+            results_list = pool.starmap(
+                self.scrape_eod,
+                [(k % letter, self.__options["eod_URL_dict"][k])
+                 for k in sorted(self.__options["eod_URL_dict"].keys())
+                 for letter in string.ascii_uppercase])
         data = pandas.concat(results_list)
         # Sorted alphabetically to ensure that when duplicate symbols are found
         # that exchange traded funds take precedence, then mutual funds
@@ -547,7 +549,36 @@ class HistoryUpdate(object):
         data = data[~data.index.duplicated(keep="first")]
         data.sort_index(inplace=True)
         data.index.name = "symbol"
-        self.__logger.info("got security data %s" % p)
+        symbol_tuples = list(zip(data.index, data["type"]))
+        metadata = list()
+        # Create a concurrent thread pool to collect the metadata for every
+        # remaining symbol in parallel, each request spends nearly all of its
+        # time waiting on the network and every security type has its own
+        # scraper so no state is shared between the threads
+        with multiprocessing.pool.ThreadPool(
+                processes=self.__options["metadata_pool_size"]) as pool:
+            results = [pool.apply_async(self.get_metadata, (t,))
+                       for t in symbol_tuples]
+            for (symbol, security_type), result in zip(symbol_tuples,
+                                                       results):
+                try:
+                    metadata.append(result.get(
+                        timeout=self.__options["metadata_timeout"]))
+                except multiprocessing.TimeoutError:
+                    # Substitute the default values for the stalled symbol
+                    # only and keep collecting the remaining symbols
+                    self.__logger.error("get metadata timed out for %s %s %s",
+                                        symbol, security_type, p)
+                    metadata.append((-1, "UNKNOWN", "UNKNOWN"))
+        # Insert the metadata tuples as columns in a single pass
+        data = data.join(pandas.DataFrame(
+            metadata, index=data.index,
+            columns=["assets", "category", "family"]))
+        # Classify the market capitalization of every security at once
+        data.insert(data.columns.get_loc("assets") + 1, "cap",
+                    securitiesanalysis.utilities.get_caps(
+                        data["assets"].to_numpy()))
+        self.__logger.info("got security data %s", p)
         return data
 
     def __update_history(self, symbol, price):
@@ -565,15 +596,12 @@ class HistoryUpdate(object):
             Daily closing price of security.
 
         """
-        p = multiprocessing.current_process().name
-        self.__logger.info("updating history for %s on %s with %s %s"
-                       % (symbol, str(self.__log_date), price, p))
-        with codecs.open(os.path.join(self.__history_path, "%s.txt" % symbol),
-                         "a+", "utf-8") as history_file:
+        with open(os.path.join(self.__history_path, "%s.txt" % symbol), "a",
+                  encoding="utf-8") as history_file:
             # Appends the current closing price to the security history file
             history_file.write("%s %s\n" % (str(self.__log_date), price))
-        self.__logger.info("updated history for %s on %s with %s %s"
-                       % (symbol, str(self.__log_date), price, p))
+        self.__logger.debug("updated history for %s on %s with %s",
+                            symbol, self.__log_date, price)
 
     def __get_splits(self):
         """
@@ -589,14 +617,13 @@ class HistoryUpdate(object):
 
         """
         p = multiprocessing.current_process().name
-        self.__logger.info("get splits %s" % p)
-        data = type(self)._scraper.scrape(self.options["split_URL"])
+        self.__logger.info("get splits %s", p)
+        data = self.__scrapers["split"].scrape(self.__options["split_URL"])
         symbol = [d[0] for d in data[0]]
         # Convert split dates into float values for later comparisons
-        split_date = [round(
-            securitiesanalysis.utilities.get_yearfrac(
-                datetime.datetime.strptime(d[1], "%Y-%m-%d").date()),
-            6) for d in data[0]]
+        split_date = numpy.round(securitiesanalysis.utilities.get_yearfracs(
+            pandas.to_datetime([d[1] for d in data[0]], format="%Y-%m-%d",
+                               cache=True)), 6)
         # Number of shares before the split occurred
         before = [float(d[2]) for d in data[0]]
         # Number of resulting shares after the split occurred
@@ -610,7 +637,7 @@ class HistoryUpdate(object):
         splits = splits[
             splits["date"] <= securitiesanalysis.utilities.get_yearfrac(
                 self.__log_date + datetime.timedelta(days=1))]
-        self.__logger.info("got splits %s" % p)
+        self.__logger.info("got splits %s", p)
         return splits
 
     def __split_update(self, symbol, before, after, split_date):
@@ -633,55 +660,47 @@ class HistoryUpdate(object):
 
         """
         p = multiprocessing.current_process().name
-        self.__logger.info(
-            "split update %s %s %s %s %s" % (symbol, before, after, split_date,
-                                             p))
+        self.__logger.info("split update %s %s %s %s %s", symbol, before,
+                           after, split_date, p)
         # Check to determine if closing price history has been collected for
         # passed in symbol
         if os.path.exists(os.path.join(self.__history_path,
                                        "%s.txt" % symbol)):
-            if "%s %s %s %s" % (
-                    symbol, before, after,
+            if (symbol, before, after,
                     split_date) in self.__applied_split_set:
-                self.__logger.info(
-                    "already applied split %s %s %s %s %s" % (
-                        symbol, before, after, split_date, p))
+                self.__logger.info("already applied split %s %s %s %s %s",
+                                   symbol, before, after, split_date, p)
             else:
                 history = pandas.read_csv(
                     os.path.join(self.__history_path, "%s.txt" % symbol),
                     sep=" ", header=None, names=["price"],
-                    index_col=0)
-                old_index = history.index
+                    index_col=0, dtype={"price": numpy.float64})
                 # Convert history dates into float values for later comparisons
-                history.index = [securitiesanalysis.utilities.get_yearfrac(
-                    datetime.datetime.strptime(h, "%Y-%m-%d").date()
-                ) for h in history.index]
+                dates = securitiesanalysis.utilities.get_yearfracs(
+                    pandas.to_datetime(history.index, format="%Y-%m-%d",
+                                       cache=True))
                 # Multiply the closing prices occurring before the split date
                 # by the ratio of the before and after number of shares
-                history["price"] = [round(
-                    row["price"] * after / before, 2
-                ) if index < split_date else row["price"]
-                                    for index, row in history.iterrows()]
-                history.index = old_index
+                mask = dates < split_date
+                history.loc[mask, "price"] = numpy.round(
+                    history.loc[mask, "price"].values * after / before, 2)
                 history.to_csv(os.path.join(
                     self.__history_path, "%s.txt" % symbol),
                     sep=" ", header=None, encoding="utf-8")
                 self.__logger.info(
-                    "updating applied splits with %s %s %s %s %s" % (
-                        symbol, before, after, split_date, p)
-                )
+                    "updating applied splits with %s %s %s %s %s",
+                    symbol, before, after, split_date, p)
                 self.message_list.append(
                     "updating applied splits with %s %s %s %s" % (
                         symbol, before, after, split_date)
                 )
                 self.__applied_split_set.add(
-                    "%s %s %s %s" % (symbol, before, after, split_date)
-                )
+                    (symbol, before, after, split_date))
         else:
             self.__logger.info(
-                "no history to update prices for splits with %s" % symbol)
-        self.__logger.info("split updated %s %s %s %s %s" % (
-            symbol, before, after, split_date, p))
+                "no history to update prices for splits with %s", symbol)
+        self.__logger.info("split updated %s %s %s %s %s", symbol, before,
+                           after, split_date, p)
 
     def execute(self):
         """
@@ -696,22 +715,28 @@ class HistoryUpdate(object):
         """
         self.__initialize_directories__()
         self.__configure_scraper__()
-        self.__logger.info("starting update for %s" % str(self.__log_date))
+        self.__logger.info("starting update for %s", self.__log_date)
         self.__data = self.get_security_data()
-        [self.__update_history(index, row["price"]) for index,
-                                                        row in
-         self.__data.iterrows()]
-        # Update the regular expression patterns and attributes to collect
-        type(self)._scraper.pattern_list = [self.options["split_pattern"]]
-        type(self)._scraper.findall = True
-        type(self)._scraper.groups = None
-        [self.__split_update(
-            index, row["before"], row["after"], row["date"]) for index,
-                                                                 row in
-            self.__get_splits().iterrows()]
+        # Skip prices that could not be parsed so no undefined values reach
+        # the history files and the fits of every period containing the day
+        prices = self.__data["price"].dropna()
+        # Append the closing prices in symbol order so the history files are
+        # visited in directory order
+        for symbol, price in sorted(zip(prices.index, prices)):
+            self.__update_history(symbol, price)
+        self.__logger.info("updated history for %s symbols on %s",
+                           len(prices), self.__log_date)
+        splits = self.__get_splits()
+        for symbol, before, after, split_date in splits[
+                ["before", "after", "date"]].itertuples(name=None):
+            self.__split_update(symbol, before, after, split_date)
         # Update the list of applied splits to avoid duplicate processing
         self.__options["applied_split_set"] = sorted(
-            list(self.__applied_split_set))
+            format_split(s) for s in self.__applied_split_set)
+        # Release the connections held open by every scraper
+        type(self)._scraper.close()
+        for scraper in self.__scrapers.values():
+            scraper.close()
 
     @property
     def data(self):
@@ -26,11 +26,42 @@ Copyright (C) 2024 John Sonsini.  All rights reserved.  Source code available
 under the AGPLv3.
 
 """
+import functools
 import re
 import time
 
+import requests.adapters
 import requests.exceptions
 
+import securitiesanalysis.utilities
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+"""tuple: HTTP status codes indicating a request may succeed if retried."""
+
+
+@functools.lru_cache(maxsize=64)
+def compile_pattern(pattern, flags=0):
+    """
+    Compiles regular expression once for reuse across scrapers.
+
+    Caches the compiled form of each pattern string so that scrapers sharing
+    a pattern, or reassigning the same pattern list, do not compile it again.
+
+    Parameters
+    ----------
+    pattern : str
+        Regular expression to compile.
+    flags : int
+        Regular expression flags to compile with.
+
+    Returns
+    -------
+    obj
+        Compiled regular expression.
+
+    """
+    return re.compile(pattern, flags)
+
 
 class RegexWebScraper(object):
     """
@@ -43,12 +74,14 @@ class RegexWebScraper(object):
     """
 
     def __init__(self, pattern_list, timeout, delay_time, max_retries,
-                 verify=False, findall=False, groups=None):
+                 verify=False, findall=False, groups=None, pool_size=10,
+                 max_delay_time=600, max_retry_time=300, flags=re.ASCII):
         """
         Prepares all needed instance variables for scraping.
 
         Sets up regular expressions and related options, retry logic
-        parameters, and server certificate check.
+        parameters, server certificate check, and a persistent HTTP session so
+        connections to the same host are reused between requests.
 
         Parameters
         ----------
@@ -57,7 +90,8 @@ class RegexWebScraper(object):
         timeout : int
             Number of seconds to allow GET request to return.
         delay_time : int
-            Number of seconds to wait before retry.
+            Number of seconds to wait before the first retry, doubled for each
+            subsequent retry.
         max_retries : int
             Number of attempts to allow GET to return response.
         verify : boolean
@@ -66,14 +100,31 @@ class RegexWebScraper(object):
             Flag to return all matches found in HTML document.
         groups : tuple
             Indices of subgroups from matches to filter returns.
+        pool_size : int
+            Number of connections kept open per host for concurrent use.
+        max_delay_time : int
+            Maximum number of seconds to wait before any retry, never less
+            than delay_time.
+        max_retry_time : int
+            Maximum number of seconds to spend retrying any one web page, no
+            further retry is made once the next wait would exceed it.
+        flags : int
+            Regular expression flags, ASCII matching by default since the
+            scraped fields are ticker symbols, numbers, and dates.
 
         """
-        self.__pattern_list = [re.compile(p) for p in pattern_list]
+        self.__flags = flags
+        """int: Regular expression flags applied to every pattern."""
+        self.__pattern_list = [compile_pattern(p, flags) for p in pattern_list]
         """list: Collection of regular expressions to match against."""
         self.__timeout = timeout
         """int: Number of seconds to allow GET request to return."""
         self.__delay_time = delay_time
-        """int: Number of seconds to wait before retry."""
+        """int: Number of seconds to wait before the first retry."""
+        self.__max_delay_time = max_delay_time
+        """int: Maximum number of seconds to wait before any retry."""
+        self.__max_retry_time = max_retry_time
+        """int: Maximum number of seconds to spend retrying any web page."""
         self.__max_retries = max_retries
         """int: Number of attempts to allow GET to return response."""
         self.__verify = verify
@@ -82,13 +133,27 @@ class RegexWebScraper(object):
         """boolean: Flag to return all matches found in HTML document."""
         self.__groups = groups
         """tuple: Indices of subgroups from matches to filter returns."""
+        self.__session = requests.Session()
+        """obj: HTTP session reusing connections across requests."""
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size,
+                                                pool_maxsize=pool_size)
+        self.__session.mount("http://", adapter)
+        self.__session.mount("https://", adapter)
 
     def scrape(self, url):
         """
-        Wraps private scraping method by initializing retry count to zero.
+        Loads and scrapes HTML document according to configured options.
 
-        Public wrapper of recursive web scraping method that sets the starting
-        number of attempts to download the HTML document into memory at zero.
+        Attempts to load a web page up to a maximum number of retries where in
+        each attempt a timeout duration is respected along with checking the
+        server certificate if either is specified, then proceeds to match the
+        contents against a list of regular expressions, returning all matches
+        or select groups for each.  Rate limiting and server error responses
+        are retried honoring any Retry-After header, any other error response
+        is not retried, and timeouts, connection errors, and all remaining
+        exceptions are retried, every retry counting towards the maximum.
+        Retrying also stops once the next wait would run past the maximum
+        retry time measured from the first attempt.
 
         Parameters
         ----------
@@ -98,72 +163,121 @@ class RegexWebScraper(object):
         Returns
         -------
         list
-            All matched strings based on configured regular expressions.
+            All matched strings based on configured regular expressions, or
+            the same empty values as a page without matches if the web page
+            could not be loaded.
 
         """
-        return self.__scrape_retry(url, 0)
+        attempt = 0
+        start = time.monotonic()
+        while True:
+            try:
+                # Retrieve the contents of the HTML document
+                response = self.__session.get(url, verify=self.__verify,
+                                              timeout=self.__timeout)
+                response.raise_for_status()
+                # Decode as UTF-8 when the server does not declare a character
+                # set rather than scanning the whole body to guess one
+                if response.encoding is None:
+                    response.encoding = "utf-8"
+                contents = response.text
+            except requests.exceptions.HTTPError as e:
+                if e.response.status_code not in RETRY_STATUS_CODES:
+                    return self.__get_defaults()
+                delay = self.__get_backoff(
+                    attempt, e.response.headers.get("Retry-After"))
+            except Exception:
+                delay = self.__get_backoff(attempt)
+            else:
+                return self.__match(contents)
+            # Give up once out of attempts or when waiting again would run
+            # past the time allowed for the page
+            if self.__max_retries <= attempt + 1 or self.__max_retry_time < \
+                    time.monotonic() - start + delay:
+                return self.__get_defaults()
+            time.sleep(delay)
+            attempt += 1
+
+    def __get_backoff(self, attempt, retry_after=None):
+        """
+        Calculates the number of seconds to wait before the next retry.
+
+        Uses the delay requested by the server when provided, bounded by the
+        maximum delay, otherwise doubles the configured delay for every failed
+        attempt with jitter.
+
+        Parameters
+        ----------
+        attempt : int
+            Number of failed attempts preceding the retry.
+        retry_after : str
+            Value of the Retry-After response header, if any.
+
+        Returns
+        -------
+        float
+            Number of seconds to wait.
 
-    def __scrape_retry(self, url, retry_count):
         """
-        Loads and scrapes HTML document according to configured options.
+        if retry_after and retry_after.strip().isdigit():
+            return min(max(self.__max_delay_time, self.__delay_time),
+                       int(retry_after))
+        return securitiesanalysis.utilities.get_backoff(
+            attempt, self.__delay_time, self.__max_delay_time)
+
+    def __get_defaults(self):
+        """
+        Provides the values returned when the web page could not be loaded.
+
+        Returns
+        -------
+        list
+            An empty list for each pattern when all matches are returned,
+            otherwise None for each pattern.
+
+        """
+        if self.__findall:
+            return [list() for _ in self.__pattern_list]
+        return [None] * len(self.__pattern_list)
+
+    def __match(self, contents):
+        """
+        Matches HTML document contents against the configured patterns.
 
-        Recursively attempts to load a web page up to a maximum number of
-        retries where in each iteration a timeout duration is respected along
-        with checking the server certificate if either is specified, then
-        proceeds to match the contents against a list of regular expressions,
-        returning all matches or select groups for each.
+        Returns all matches or select groups for each regular expression, or
+        an empty value for any pattern that does not match.
 
         Parameters
         ----------
-        url : str
-            Address of web page to be scraped via regular expression matching.
-        retry_count : int
-            Number of attempts to load web page into memory (does not include
-            any ReadTimeout or ConnectionError exceptions thrown during
-            processing).
+        contents : str
+            Text of the downloaded HTML document.
 
         Returns
         -------
-        matches : list
+        list
             All matched strings based on configured regular expressions.
 
         """
-        try:
-            # Retrieve the contents of the HTML document
-            contents = requests.get(url, verify=self.__verify,
-                                    timeout=self.__timeout).text
-            try:
-                if self.__findall:
-                    # Extract all of the matches in the document
-                    matches = [re.findall(p.pattern, contents)
-                               for p in self.__pattern_list]
-                else:
-                    if self.__groups:
-                        # Extract the configured groups for the first match
-                        matches = [p.search(contents).group(*self.__groups)
-                                   for p in self.__pattern_list]
-                    else:
-                        # Extract the first match for each pattern
-                        matches = [p.search(contents).group()
-                                   for p in self.__pattern_list]
-            except:
-                # Substitute an empty value for each pattern on error
-                matches = [None] * len(self.__pattern_list)
-        except requests.exceptions.ReadTimeout:
-            time.sleep(self.__delay_time)
-            return self.__scrape_retry(url, retry_count)
-        except requests.exceptions.ConnectionError:
-            time.sleep(self.__delay_time)
-            return self.__scrape_retry(url, retry_count)
-        except:
-            retry_count += 1
-            if retry_count < self.__max_retries:
-                time.sleep(self.__delay_time)
-                return self.__scrape_retry(url, retry_count)
-            else:
-                return [None] * len(self.__pattern_list)
-        else:
-            return matches
+        if self.__findall:
+            # Extract all of the matches in the document
+            return [p.findall(contents) for p in self.__pattern_list]
+        searches = [p.search(contents) for p in self.__pattern_list]
+        if self.__groups:
+            # Extract the configured groups for the first match
+            return [m.group(*self.__groups) if m is not None else None
+                    for m in searches]
+        # Extract the first match for each pattern
+        return [m.group() if m is not None else None for m in searches]
+
+    def close(self):
+        """
+        Releases all connections held by the HTTP session.
+
+        The session remains usable afterwards and opens new connections on
+        demand.
+
+        """
+        self.__session.close()
 
     @property
     def verify(self):
@@ -182,10 +296,11 @@ class RegexWebScraper(object):
     @pattern_list.setter
     def pattern_list(self, pattern_list):
         try:
-            temp = [re.compile(p) for p in pattern_list]
-        except:
-            temp = self.__pattern_list
-        self.__pattern_list = temp
+            self.__pattern_list = [compile_pattern(p, self.__flags)
+                                   for p in pattern_list]
+        except (re.error, TypeError):
+            # Keep the previously compiled patterns if any pattern is invalid
+            pass
 
     @property
     def timeout(self):
@@ -198,13 +313,33 @@ class RegexWebScraper(object):
 
     @property
     def delay_time(self):
-        """int: Number of seconds to wait before retry."""
+        """int: Number of seconds to wait before the first retry."""
         return self.__delay_time
 
     @delay_time.setter
     def delay_time(self, delay_time):
         self.__delay_time = delay_time if 0 < delay_time else self.__delay_time
 
+    @property
+    def max_delay_time(self):
+        """int: Maximum number of seconds to wait before any retry."""
+        return self.__max_delay_time
+
+    @max_delay_time.setter
+    def max_delay_time(self, max_delay_time):
+        self.__max_delay_time = max_delay_time if 0 < max_delay_time \
+            else self.__max_delay_time
+
+    @property
+    def max_retry_time(self):
+        """int: Maximum number of seconds to spend retrying any web page."""
+        return self.__max_retry_time
+
+    @max_retry_time.setter
+    def max_retry_time(self, max_retry_time):
+        self.__max_retry_time = max_retry_time if 0 < max_retry_time \
+            else self.__max_retry_time
+
     @property
     def max_retries(self):
         """int: Number of attempts to allow GET to return response."""
@@ -26,13 +26,13 @@ Copyright (C) 2024 John Sonsini.  All rights reserved.  Source code available
 under the AGPLv3.
 
 """
-import codecs
 import copy
 import datetime
 import email.mime.application
 import email.mime.multipart
 import email.mime.text
 import itertools
+import logging.handlers
 import math
 import multiprocessing
 import pydoc
@@ -40,18 +40,80 @@ import os
 import shutil
 import smtplib
 import socket
-import sys
 import time
 
 import numpy
 import pandas
 import scipy.optimize
-import scipy.stats.mstats
-import sklearn.metrics
 import xlsxwriter
 
 import securitiesanalysis.utilities
 
+_analysis = None
+"""obj: Analysis instance inherited by each worker process of the pool."""
+
+
+def _initialize_worker(analysis, queue):
+    """
+    Stores the analysis instance for use by the worker process.
+
+    Called once as each pool worker starts so that the instance, including
+    all collected data, is not pickled again for every task.  The handlers
+    inherited from the parent process are replaced by one forwarding log
+    records to the parent so that only a single process writes the log file.
+
+    Parameters
+    ----------
+    analysis : obj
+        Analysis instance performing the regression fits.
+    queue : obj
+        Queue consumed by the log listener of the parent process.
+
+    """
+    global _analysis
+    _analysis = analysis
+    # Detach the inherited handlers without closing the parent's file
+    for h in list(analysis.logger.handlers):
+        analysis.logger.removeHandler(h)
+    analysis.logger.addHandler(logging.handlers.QueueHandler(queue))
+
+
+def _process_history(symbol):
+    """
+    Generates return ratios and regression fits for a security in a worker.
+
+    Parameters
+    ----------
+    symbol : str
+        Ticker symbol representing security.
+
+    Returns
+    -------
+    tuple
+        Actual ratios and regression fits from process_history.
+
+    """
+    return _analysis.process_history(symbol)
+
+
+def _process_summary(report):
+    """
+    Generates coefficient ratios and regression fits for a security in a worker.
+
+    Parameters
+    ----------
+    report : tuple
+        Ticker symbol and dataframe containing non linear regression
+        coefficients.
+
+    Returns
+    -------
+    tuple
+        Symbol, actual ratios, and regression fits from process_summary.
+
+    """
+    return _analysis.process_summary(report)
+
 
 class SecuritiesAnalysis(object):
     """
@@ -98,6 +160,10 @@ class SecuritiesAnalysis(object):
         """str: Folder containing security history files."""
         self.__report_path = os.path.join(root_path, "reports")
         """str: Folder containing all output directories and files."""
+        self.__data_path = os.path.join(self.__report_path, "data")
+        """str: Folder containing daily collected data files."""
+        self.__summary_path = os.path.join(self.__report_path, "summary")
+        """str: Folder containing summary workbooks."""
         self.__options = options
         """dictionary: Dictionary of configured options."""
         self.__data = data
@@ -126,51 +192,56 @@ class SecuritiesAnalysis(object):
         coefficients.
 
         """
+        # Convert the yearly boundaries over the last three years at once
         ranges = list(
             itertools.combinations(
-                [d.to_pydatetime().date() for d in
-                 pandas.date_range(datetime.date(self.__log_date.year - 3,
-                                                 self.__log_date.month,
-                                                 self.__log_date.day),
-                                   self.__log_date,
-                                   freq=pandas.DateOffset(years=1)
-                                   ).tolist()],
+                securitiesanalysis.utilities.get_yearfracs(
+                    pandas.date_range(datetime.date(self.__log_date.year - 3,
+                                                    self.__log_date.month,
+                                                    self.__log_date.day),
+                                      self.__log_date,
+                                      freq=pandas.DateOffset(years=1))),
                 2))
         # Only keep the date ranges as stipulated above
         self.__ranges = pandas.DataFrame(
             index=["3Y", "3YD", "2Y", "2YD", "1Y"],
-            data={
-                "start": [
-                    securitiesanalysis.utilities.get_yearfrac(r[0])
-                    for r in ranges[:1] + ranges[2:]],
-                "end": [
-                    securitiesanalysis.utilities.get_yearfrac(r[1])
-                    for r in ranges[:1] + ranges[2:]]})
-        summary_ranges = pandas.date_range(
-            end=self.__log_date, periods=13,
-            freq=pandas.DateOffset(months=1)).tolist()
+            data={"start": [r[0] for r in ranges[:1] + ranges[2:]],
+                  "end": [r[1] for r in ranges[:1] + ranges[2:]]})
+        summary_ranges = securitiesanalysis.utilities.get_yearfracs(
+            pandas.date_range(end=self.__log_date, periods=13,
+                              freq=pandas.DateOffset(months=1)))
         # Only keep the one, three, and six month and one year date ranges
-        summary_ranges = [
-            (securitiesanalysis.utilities.get_yearfrac(summary_ranges[i]),
-             securitiesanalysis.utilities.get_yearfrac(self.__log_date))
-            for i in [0, 6, 9, 11]]
         self.__summary_ranges = pandas.DataFrame(
             index=["1Y", "6M", "3M", "1M"],
-            data={"start": [r[0] for r in summary_ranges],
-                  "end": [r[1] for r in summary_ranges]})
-
-    def get_fit(self, history, symbol, duration):
+            data={"start": summary_ranges[[0, 6, 9, 11]],
+                  "end": securitiesanalysis.utilities.get_yearfrac(
+                      self.__log_date)})
+        # Keep the boundaries as arrays for the per symbol lookups
+        self.__range_starts = self.__ranges["start"].to_numpy()
+        self.__range_ends = self.__ranges["end"].to_numpy()
+        self.__summary_range_starts = \
+            self.__summary_ranges["start"].to_numpy()
+        self.__summary_range_ends = self.__summary_ranges["end"].to_numpy()
+
+    def get_fit(self, dates, prices, log_prices, symbol, duration):
         """
         Calculates non linear regression fit for passed in data.
 
         Determines the best fit for the model y = a * (b ^ x) where the x
         variable is the date normalized by first value and the y variable is
-        the daily closing price.
+        the daily closing price.  Unless disabled in the options the fit is
+        calculated in closed form by linear least squares on the logarithm of
+        the prices, falling back to non linear least squares when any price is
+        not positive.
 
         Parameters
         ----------
-        history : obj
-            Daily closing prices with corresponding dates.
+        dates : array
+            Dates of the daily closing prices as year fractions.
+        prices : array
+            Daily closing prices.
+        log_prices : array
+            Natural logarithm of the daily closing prices.
         symbol : str
             Ticker symbol representing security.
         duration : str
@@ -188,33 +259,38 @@ class SecuritiesAnalysis(object):
         """
         try:
             p = multiprocessing.current_process().name
-            self.__logger.info("get fit for %s %s %s" % (symbol, duration, p))
+            self.__logger.info("get fit for %s %s %s", symbol, duration, p)
             # Provide default values in case fit is not able to be calculated
             fit = numpy.nan
             r2 = numpy.nan
             rmse = numpy.nan
-            # Normalize the history so the independent variable starts at zero
-            history.index = [i - history.index[0] for i in history.index]
-            popt, _ = scipy.optimize.curve_fit(
-                securitiesanalysis.utilities.func, history.index,
-                history["price"])
+            # Normalize the dates so the independent variable starts at zero
+            x = dates - dates[0]
+            y = prices
+            if self.__options["log_linear_fit"] and (0 < y).all():
+                # Solve log(y) = log(a) + x * log(b) directly by linear least
+                # squares rather than iterating on the exponential model
+                (log_b, log_a), _, _, _ = numpy.linalg.lstsq(
+                    numpy.column_stack([x, numpy.ones_like(x)]), log_prices,
+                    rcond=None)
+                popt = (math.exp(log_a), math.exp(log_b))
+            else:
+                popt, _ = scipy.optimize.curve_fit(
+                    securitiesanalysis.utilities.func, x, y,
+                    jac=securitiesanalysis.utilities.jac)
             # Capture the b term (rate of growth) from the y = a * (b ^ x) fit
             fit = popt[1]
             # Generate the dependent variable values based on the fit function
-            predict = [securitiesanalysis.utilities.func(h, *popt)
-                       for h in history.index]
-            r2 = sklearn.metrics.r2_score(history["price"], predict)
-            rmse = math.sqrt(
-                sklearn.metrics.mean_squared_error(history["price"], predict))
-            self.__logger.info("found fit for %s %s %s %s %s %s"
-                               % (symbol, duration, fit, r2, rmse, p))
-        except:
-            self.__logger.error(
-                "get fit generic error for %s %s %s %s"
-                % (symbol, duration,
-                   securitiesanalysis.utilities.format_error(sys.exc_info()),
-                   p)
-            )
+            # evaluated over the whole period at once
+            predict = securitiesanalysis.utilities.func(x, *popt)
+            r2, rmse = securitiesanalysis.utilities.get_fit_errors(y, predict)
+            self.__logger.info("found fit for %s %s %s %s %s %s", symbol,
+                               duration, fit, r2, rmse, p)
+        except Exception as e:
+            self.__logger.error("get fit generic error for %s %s %s %s",
+                                symbol, duration,
+                                securitiesanalysis.utilities.format_error(e),
+                                p)
         return fit, r2, rmse
 
     def process_history(self, symbol):
@@ -242,59 +318,62 @@ class SecuritiesAnalysis(object):
         """
         try:
             p = multiprocessing.current_process().name
-            self.__logger.info("process history for %s %s" % (symbol, p))
+            self.__logger.info("process history for %s %s", symbol, p)
             # Provide default values in case periods do not have complete data
             actual = [numpy.nan for i in range(5)]
             fit = [3 * [numpy.nan] for i in range(5)]
             history = pandas.read_csv(
                 os.path.join(self.__history_path, "%s.txt" % symbol),
-                sep=" ", header=None, names=["price"], index_col=0)
-            history.index = [securitiesanalysis.utilities.get_yearfrac(
-                datetime.datetime.strptime(h, "%Y-%m-%d").date()
-            ) for h in history.index]
+                sep=" ", header=None, names=["price"], index_col=0,
+                dtype={"price": numpy.float64})
+            # Convert the date strings to year fractions in a single pass
+            history.index = securitiesanalysis.utilities.get_yearfracs(
+                pandas.to_datetime(history.index, format="%Y-%m-%d",
+                                   cache=True))
+            dates = history.index.values
+            prices = history["price"].values
+            starts = self.__range_starts
+            ends = self.__range_ends
             # Determine if data exists to fill each date range completely
-            fill_period = [
-                history.index[0] <= self.__ranges["start"][i] for i in
-                self.__ranges.index]
-            # Find the dataframe indices closest to the range boundaries
-            # closest_indices = [(history.index.get_loc(
-            #     self.__ranges["start"][i], method="nearest"),
-            #                     history.index.get_loc(self.__ranges["end"][i],
-            #                                           method="nearest"))
-            #                    if fill_period[i] else numpy.nan for i in
-            #                    range(len(fill_period))]
-
-            closest_indices = [
-                (history.index.get_indexer(
-                    [self.__ranges["start"][i]], method="nearest"),
-                 history.index.get_indexer(
-                     [self.__ranges["end"][i]], method="nearest"))
-                if fill_period[i] else numpy.nan for i in
-                range(len(fill_period))]
-            closest_dates = [(history.index[c[0]],
-                              history.index[c[1]]) if c is not numpy.nan
-                             else numpy.nan for c in closest_indices]
+            fill_period = dates[0] <= starts
+            # Skip the lookups and fits entirely for recently listed
+            # securities without enough history to fill any period
+            if not fill_period.any():
+                self.__logger.info("insufficient history for %s %s", symbol, p)
+                return actual, fit
+            # Find the positions closest to the range boundaries
+            start_indices = securitiesanalysis.utilities.get_closest_indices(
+                dates, starts)
+            end_indices = securitiesanalysis.utilities.get_closest_indices(
+                dates, ends)
             # Calculate the ratio of start and end price for each period
-            actual = [
-                "%.6f" % (1 + (history.loc[d[1][0]]["price"]
-                               / history.loc[d[0][0]]["price"] - 1)
-                          / (d[1][0] - d[0][0])) if d is not numpy.nan and
-                not history.loc[d[0][0]]["price"] == 0
-                else numpy.nan for d in closest_dates]
+            start_prices = prices[start_indices]
+            with numpy.errstate(divide="ignore", invalid="ignore"):
+                ratios = 1 + (prices[end_indices] / start_prices - 1) / (
+                    dates[end_indices] - dates[start_indices])
+            actual = numpy.where(fill_period & (start_prices != 0), ratios,
+                                 numpy.nan).tolist()
+            # Take the logarithm of the whole history once and share slices
+            # of it across the overlapping periods, non positive prices are
+            # left undefined and fall back to the non linear fit
+            with numpy.errstate(divide="ignore", invalid="ignore"):
+                log_prices = numpy.log(prices)
+            # Locate the inclusive bounds of every period in one pass each
+            lower = dates.searchsorted(starts, side="left")
+            upper = dates.searchsorted(ends, side="right")
             # Generate the fits of the same periods and collect the growth rate
-            fit = [["%.6f"
-                    % v for v in self.get_fit(
-                history[self.__ranges["start"]
-                        [i]:self.__ranges["end"][i]],
-                symbol, self.__ranges.index[i])] if fill_period[i]
-                   else 3 * [numpy.nan] for i in range(len(fill_period))]
-            self.__logger.info("processed history for %s %s %s %s"
-                               % (symbol, str(actual), str(fit), p))
-        except:
-            self.__logger.error("process history generic error for %s %s %s"
-                                % (symbol,
-                                   securitiesanalysis.utilities.format_error(
-                                       sys.exc_info()), p))
+            fit = [self.get_fit(
+                dates[lower[i]:upper[i]], prices[lower[i]:upper[i]],
+                log_prices[lower[i]:upper[i]], symbol,
+                self.__ranges.index[i]) if fill_period[i] else 3 * [numpy.nan]
+                   for i in range(len(fill_period))]
+            self.__logger.info("processed history for %s %s %s %s", symbol,
+                               actual, fit, p)
+        except Exception as e:
+            self.__logger.error("process history generic error for %s %s %s",
+                                symbol,
+                                securitiesanalysis.utilities.format_error(e),
+                                p)
         return actual, fit
 
     def get_regression_coefficients(self):
@@ -308,28 +387,66 @@ class SecuritiesAnalysis(object):
 
         """
         p = multiprocessing.current_process().name
-        self.__logger.info("get regression coefficients %s" % p)
-        actual_fit = [self.process_history(i) for i in self.__data.index]
-        # Extract the nested tuple elements into separate lists of lists
-        # The elements of each are lists of values over the defined periods
-        actual = [af[0] for af in actual_fit]
-        fit = [[i[0] for i in af[1]] for af in actual_fit]
-        r2 = [[i[1] for i in af[1]] for af in actual_fit]
-        rmse = [[i[2] for i in af[1]] for af in actual_fit]
-        # Extract the list for each period and value for the dataframe
-        self.__data["3YA"], self.__data["3YDA"], self.__data["2YA"], \
-            self.__data["2YDA"], self.__data["1YA"] = \
-            tuple([[a[i] for a in actual] for i in range(5)])
-        self.__data["3YF"], self.__data["3YDF"], self.__data["2YF"], \
-            self.__data["2YDF"], self.__data["1YF"] = \
-            tuple([[f[i] for f in fit] for i in range(5)])
-        self.__data["3YR2"], self.__data["3YDR2"], self.__data["2YR2"], \
-            self.__data["2YDR2"], self.__data["1YR2"] = \
-            tuple([[r[i] for r in r2] for i in range(5)])
-        self.__data["3YRMSE"], self.__data["3YDRMSE"], self.__data["2YRMSE"], \
-            self.__data["2YDRMSE"], self.__data["1YRMSE"] = \
-            tuple([[r[i] for r in rmse] for i in range(5)])
-        self.__logger.info("got regression coefficients %s" % p)
+        self.__logger.info("get regression coefficients %s", p)
+        # Fit every security in parallel across a process pool since each fit
+        # is independent and bound by computation
+        actual_fit = self.__map_workers(_process_history, self.__data.index)
+        # Stack the nested tuple elements into symbol by period arrays with
+        # the fit, coefficient of determination, and error along the last axis
+        actual = numpy.array([af[0] for af in actual_fit],
+                             dtype=numpy.float64).reshape(-1, 5)
+        fit = numpy.array([af[1] for af in actual_fit],
+                          dtype=numpy.float64).reshape(-1, 5, 3)
+        # Slice out the values of each period for the dataframe columns
+        for i, r in enumerate(self.__ranges.index):
+            self.__data["%sA" % r] = actual[:, i]
+        for j, v in enumerate(["F", "R2", "RMSE"]):
+            for i, r in enumerate(self.__ranges.index):
+                self.__data["%s%s" % (r, v)] = fit[:, i, j]
+        self.__logger.info("got regression coefficients %s", p)
+
+    def __map_workers(self, function, iterable):
+        """
+        Applies function to every element of iterable across a process pool.
+
+        Log records from the workers are passed through a queue to a listener
+        thread that writes them with the handlers of this process, keeping the
+        lines from concurrent workers intact.  The workers are always forked
+        so that they inherit this instance, including its collected data,
+        and the configured logger rather than receiving a pickled copy.
+
+        Parameters
+        ----------
+        function : obj
+            Module level function to call in the worker processes.
+        iterable : obj
+            Elements to pass to function.
+
+        Returns
+        -------
+        list
+            Results of function in the order of iterable.
+
+        """
+        context = multiprocessing.get_context("fork")
+        queue = context.Queue()
+        listener = logging.handlers.QueueListener(
+            queue, *self.__logger.handlers, respect_handler_level=True)
+        listener.start()
+        try:
+            with context.Pool(
+                    processes=self.__options["analysis_pool_size"],
+                    initializer=_initialize_worker,
+                    initargs=(self, queue)) as pool:
+                results = pool.map(function, iterable)
+                # Let the workers flush their queued log records and exit
+                # before leaving the block terminates any still running, a
+                # worker killed mid write would hold the queue lock forever
+                pool.close()
+                pool.join()
+            return results
+        finally:
+            listener.stop()
 
     def collect_reports(self):
         """
@@ -346,25 +463,26 @@ class SecuritiesAnalysis(object):
 
         """
         p = multiprocessing.current_process().name
-        self.__logger.info(
-            "collecting reports for %s %s" % (str(self.__log_date), p))
-        # Generate a list of previous report paths
-        report_paths = [
-            (os.path.join(self.__report_path, "data", r),
-             securitiesanalysis.utilities.get_yearfrac(
-                 datetime.datetime.strptime(r[:-4],
-                                            "%Y-%m-%d").date()
-             )) for r in os.listdir(os.path.join(self.__report_path, "data"))]
+        self.__logger.info("collecting reports for %s %s", self.__log_date, p)
+        # Generate a list of previous report names and their dates
+        report_names = sorted(os.listdir(self.__data_path))
+        report_dates = securitiesanalysis.utilities.get_yearfracs(
+            pandas.to_datetime([r[:-4] for r in report_names],
+                               format="%Y-%m-%d", cache=True))
+        cutoff = securitiesanalysis.utilities.get_yearfrac(
+            self.__log_date - datetime.timedelta(days=375))
+        # Declare the coefficient columns up front so the parser does not
+        # have to infer their types for every report
+        types = dict.fromkeys(self.__options["process_summary_columns"],
+                              numpy.float64)
         # Filter the list to just over the prior year's worth of reports
-        reports = [(pandas.read_csv(r[0], sep="|", header=0,
-                                    index_col=0,
-                                    usecols=self.__options["collect_columns"]),
-                    r[1]
-                    ) for r in sorted(report_paths) if
-                   securitiesanalysis.utilities.get_yearfrac(
-                       self.__log_date - datetime.timedelta(days=375)) <= r[1]]
-        self.__logger.info(
-            "collected reports for %s %s" % (str(self.__log_date), p))
+        reports = [(pandas.read_csv(os.path.join(self.__data_path, r),
+                                    sep="|", header=0, index_col=0,
+                                    usecols=self.__options["collect_columns"],
+                                    dtype=types),
+                    d) for r, d in zip(report_names, report_dates)
+                   if cutoff <= d]
+        self.__logger.info("collected reports for %s %s", self.__log_date, p)
         return reports
 
     def convert_reports(self, reports):
@@ -387,13 +505,12 @@ class SecuritiesAnalysis(object):
 
         """
         p = multiprocessing.current_process().name
-        self.__logger.info(
-            "converting reports for %s %s" % (str(self.__log_date), p))
+        self.__logger.info("converting reports for %s %s", self.__log_date, p)
         coverted_reports = []
         # Adds a column with the collected date to each dataframe in the list
         while reports:
             f, d = reports.pop(0)
-            f["date"] = f.shape[0] * [d]
+            f["date"] = d
             coverted_reports.append(f)
         if coverted_reports:
             # Generate one dataframe for all the collected reports
@@ -403,8 +520,7 @@ class SecuritiesAnalysis(object):
             columns = copy.deepcopy(self.__options["column_order"])
             columns.append("date")
             concatenated_reports = pandas.DataFrame(columns=columns)
-        self.__logger.info(
-            "converted reports for %s %s" % (str(self.__log_date), p))
+        self.__logger.info("converted reports for %s %s", self.__log_date, p)
         return concatenated_reports
 
     def group_reports(self, reports):
@@ -426,8 +542,7 @@ class SecuritiesAnalysis(object):
 
         """
         p = multiprocessing.current_process().name
-        self.__logger.info(
-            "grouping reports for %s %s" % (str(self.__log_date), p))
+        self.__logger.info("grouping reports for %s %s", self.__log_date, p)
         # Create list of dataframes based on ticker symbol
         grouped_reports = [group for _,
         group in reports.groupby(reports.index)]
@@ -437,11 +552,10 @@ class SecuritiesAnalysis(object):
             temp = grouped_reports[i]
             temp.index = temp.pop("date")
             grouped_reports[i] = (symbol, temp)
-        self.__logger.info(
-            "grouped reports for %s %s" % (str(self.__log_date), p))
+        self.__logger.info("grouped reports for %s %s", self.__log_date, p)
         return grouped_reports
 
-    def get_summary_fit(self, summary, symbol, duration):
+    def get_summary_fit(self, dates, values, symbol, duration):
         """
         Calculates linear regression fit for passed in non linear coefficients.
 
@@ -451,8 +565,10 @@ class SecuritiesAnalysis(object):
 
         Parameters
         ----------
-        summary : obj
-            Non linear regression coefficients and corresponding dates.
+        dates : array
+            Dates of the non linear regression coefficients as year fractions.
+        values : array
+            Non linear regression coefficients.
         symbol : str
             Ticker symbol representing security.
         duration : str
@@ -467,23 +583,27 @@ class SecuritiesAnalysis(object):
         """
         try:
             p = multiprocessing.current_process().name
-            self.__logger.info(
-                "get summary fit for %s %s %s" % (symbol, duration, p))
+            self.__logger.info("get summary fit for %s %s %s", symbol,
+                               duration, p)
             # Provide a default value in case the slope cannot be calculated
             slope = numpy.nan
-            # Normalize the index so the independent variable starts at zero
-            summary.index = [i - summary.index[0] for i in summary.index]
-            # Generate the linear slope of the regression fit
-            slope, _, _, _, _ = scipy.stats.mstats.linregress(summary.index,
-                                                              summary.values)
-            self.__logger.info("got summary fit for %s %s %s %s"
-                               % (symbol, duration, slope, p))
-        except:
+            # Normalize the dates so the independent variable starts at zero
+            x = dates - dates[0]
+            y = values
+            # Generate the linear slope of the regression fit from the
+            # centered values rather than the full set of regression statistics
+            x = x - x.mean()
+            sxx = x @ x
+            if sxx == 0:
+                raise ValueError("Cannot calculate a linear regression if all "
+                                 "x values are identical")
+            slope = x @ (y - y.mean()) / sxx
+            self.__logger.info("got summary fit for %s %s %s %s", symbol,
+                               duration, slope, p)
+        except Exception as e:
             self.__logger.error(
-                "get summary fit generic error for %s %s %s %s" % (
-                    symbol, duration,
-                    securitiesanalysis.utilities.format_error(sys.exc_info()),
-                    p))
+                "get summary fit generic error for %s %s %s %s", symbol,
+                duration, securitiesanalysis.utilities.format_error(e), p)
         return slope
 
     def process_summary(self, report):
@@ -504,60 +624,59 @@ class SecuritiesAnalysis(object):
         -------
         symbol : str
             Ticker symbol representing security.
-        actual : list
-            Ratio of starting and ending coefficients for summary durations.
-        fit : list
-            Linear regression fit coefficients for summary durations.
+        actual : array
+            Ratio of starting and ending coefficients for summary durations,
+            one row per summary column.
+        fit : array
+            Linear regression fit coefficients for summary durations, one row
+            per summary column.
 
         """
         p = multiprocessing.current_process().name
         try:
             symbol, frame = report
-            self.__logger.info("process summary for %s %s" % (symbol, p))
+            self.__logger.info("process summary for %s %s", symbol, p)
             c = self.__options["process_summary_columns"]
             # Provide default values in case periods do not have complete data
-            actual, fit = tuple(
-                2 * [dict(zip(c,
-                              [4 * [numpy.nan] for i in range(len(c))]))]
-            )
+            actual = numpy.full((len(c), 4), numpy.nan)
+            fit = numpy.full((len(c), 4), numpy.nan)
+            dates = frame.index.values
+            starts = self.__summary_range_starts
+            ends = self.__summary_range_ends
             # Determine if data exists to fill each date range completely
-            fill_period = [
-                frame.index[0] <= self.__summary_ranges["start"][i] for i in
-                self.__summary_ranges.index]
-            # Find the dataframe indices closest to the range boundaries
-            closest_indices = [
-                (frame.index.get_indexer(
-                    [self.__summary_ranges["start"][i]], method="nearest"),
-                 frame.index.get_indexer(
-                     [self.__summary_ranges["end"][i]], method="nearest"))
-                if fill_period[i] else numpy.nan for i in
-                range(len(fill_period))]
-            closest_dates = [
-                (frame.index[ci[0]], frame.index[ci[1]])
-                if ci is not numpy.nan else numpy.nan
-                for ci in closest_indices]
+            fill_period = dates[0] <= starts
+            # Find the positions closest to the range boundaries
+            start_indices = securitiesanalysis.utilities.get_closest_indices(
+                dates, starts)
+            end_indices = securitiesanalysis.utilities.get_closest_indices(
+                dates, ends)
+            # Work on the coefficients positionally, one column per summary
+            # column, rather than through label lookups on the dataframe
+            values = frame[c].to_numpy(dtype=numpy.float64)
+            start_values = values[start_indices]
             # Calculate the ratio of start and end fit for each period
-            actual = {
-                s: ["%.6f"
-                    % (1 + (frame.loc[d[1][0]][s] / frame.loc[d[0][0]][s] - 1)
-                       / (d[1][0] - d[0][0])) if d is not numpy.nan and
-                                                 not frame.loc[d[0][0]][
-                                                         s] == 0 else numpy.nan
-                    for d in closest_dates] for s in c}
+            with numpy.errstate(divide="ignore", invalid="ignore"):
+                ratios = 1 + (values[end_indices] / start_values - 1) / (
+                    dates[end_indices] - dates[start_indices])[:, None]
+            actual = numpy.where(
+                fill_period[:, None] & (start_values != 0), ratios,
+                numpy.nan).T
             # Generate the fits of the same periods and collect the linear rate
-            fit = {
-                s: ["%.6f"
-                    % (self.get_summary_fit(frame[s][closest_dates[i][0][0]:
-                                                     closest_dates[i][1][0]],
-                                            symbol, s))
-                    if fill_period[i] else numpy.nan
-                    for i in range(len(fill_period))] for s in c}
-            self.__logger.info("processed summary for %s %s" % (symbol, p))
-        except:
-            self.__logger.error("process summary generic error for %s %s %s" %
-                                (symbol,
-                                 securitiesanalysis.utilities.format_error(
-                                     sys.exc_info()), p))
+            fit = numpy.array([
+                [self.get_summary_fit(dates[start_indices[i]:
+                                            end_indices[i] + 1],
+                                      values[start_indices[i]:
+                                             end_indices[i] + 1, j],
+                                      symbol, s)
+                 if fill_period[i] else numpy.nan
+                 for i in range(len(fill_period))] for j, s in enumerate(c)],
+                dtype=numpy.float64)
+            self.__logger.info("processed summary for %s %s", symbol, p)
+        except Exception as e:
+            self.__logger.error("process summary generic error for %s %s %s",
+                                symbol,
+                                securitiesanalysis.utilities.format_error(e),
+                                p)
         return symbol, actual, fit
 
     def get_summary_regression_coefficients(self, reports):
@@ -582,30 +701,61 @@ class SecuritiesAnalysis(object):
 
         """
         p = multiprocessing.current_process().name
-        self.__logger.info("get summary regression coefficients %s" % p)
-        # Extract the nested tuple elements into separate lists of dictionaries
-        # The elements are dictionaries for each of the defined periods
-        summary_results = [self.process_summary(r) for r in reports]
+        self.__logger.info("get summary regression coefficients %s", p)
+        # Process the reports of every security in parallel across a process
+        # pool since each summary is independent and bound by computation,
+        # each report frame holds at most a year of rows for one symbol so
+        # pickling it to the worker costs little next to its fits
+        summary_results = self.__map_workers(_process_summary, reports)
         symbol = [s[0] for s in summary_results]
-        actual = [s[1] for s in summary_results]
-        fit = [s[2] for s in summary_results]
+        columns = self.__options["process_summary_columns"]
+        # Stack the per symbol arrays into symbol by column by period arrays
+        actual = numpy.array([s[1] for s in summary_results]).reshape(
+            -1, len(columns), 4)
+        fit = numpy.array([s[2] for s in summary_results]).reshape(
+            -1, len(columns), 4)
         results_dict = dict()
         s = list(self.__summary_ranges.index)
-        # Extract the list for each period and value for the dataframe
-        for c in self.__options["process_summary_columns"]:
+        # Slice out the values of each period for the dataframe columns
+        for j, c in enumerate(columns):
             for i in range(4):
-                results_dict["%s-%sA" % (c, s[i])] = [actual[j][c][i] for j in
-                                                      range(len(actual))]
-                results_dict["%s-%sF" % (c, s[i])] = [fit[j][c][i] for j in
-                                                      range(len(fit))]
+                results_dict["%s-%sA" % (c, s[i])] = actual[:, j, i]
+                results_dict["%s-%sF" % (c, s[i])] = fit[:, j, i]
         results_dict["symbol"] = symbol
         results = pandas.DataFrame.from_dict(results_dict)
         # Move the symbol column to the index
         results.index = results.pop("symbol")
-        results = results.astype(numpy.float16)
-        self.__logger.info("got summary regression coefficients %s" % p)
+        results = results.astype(numpy.float32)
+        self.__logger.info("got summary regression coefficients %s", p)
         return results
 
+    def aggregate_group(self, group):
+        """
+        Generates summary statistics for records grouped by a single column.
+
+        Aggregates every configured column in one pass over the groups and
+        flattens the resulting column names to "<column> <statistic>".
+
+        Parameters
+        ----------
+        group : str
+            Name of the column to group records by.
+
+        Returns
+        -------
+        aggregate : obj
+            Counts, means, and standard deviations for each group limited to
+            the configured aggregate columns.
+
+        """
+        # Keep the groups in key order so that ties and undefined values in
+        # the caller's sort stay in the same order in the workbook
+        aggregate = self.__data.groupby(group).aggregate(
+            self.__options["aggregate_dict"])
+        # Flatten the multi-level aggregate column names
+        aggregate.columns = aggregate.columns.map(" ".join)
+        return aggregate[self.__options["aggregate_columns"]]
+
     def aggregate(self):
         """
         Groups records in dataframe and generates summary statistics for each.
@@ -627,7 +777,7 @@ class SecuritiesAnalysis(object):
 
         """
         p = multiprocessing.current_process().name
-        self.__logger.info("starting aggregation of results %s" % p)
+        self.__logger.info("starting aggregation of results %s", p)
         # Find the top ten one year returns for each security type and cap
         top_sorted = self.__data.sort_values(
             ["type", "cap", "1YA"], ascending=[True, False, False]).groupby(
@@ -642,14 +792,9 @@ class SecuritiesAnalysis(object):
         group_dict = dict()
         # Generate counts, means, and standard deviations for the listed groups
         for g in groups:
-            group_dict[g] = self.__data.groupby(g).aggregate(a)
-            # Flatten the multi-level aggregate column names
-            group_dict[g].columns = [
-                " ".join(c).strip() for c in group_dict[g].columns.values]
-            group_dict[g] = group_dict[g][self.__options["aggregate_columns"]]
-            group_dict[g].sort_values("1YA mean", ascending=False,
-                                      inplace=True)
-        self.__logger.info("finished aggregation of results %s" % p)
+            group_dict[g] = self.aggregate_group(g).sort_values(
+                "1YA mean", ascending=False)
+        self.__logger.info("finished aggregation of results %s", p)
         return top_sorted, market, group_dict
 
     def process_fits(self):
@@ -669,25 +814,20 @@ class SecuritiesAnalysis(object):
 
         """
         p = multiprocessing.current_process().name
-        self.__logger.info("processing fits %s" % p)
+        self.__logger.info("processing fits %s", p)
         fit_dict = dict()
-        a = self.__options["aggregate_dict"]
+        # Generate counts, means, and standard deviations for each category
+        # once since only the sort order differs between fit columns
+        category = self.aggregate_group("category")
         for f in self.__options["fit_columns"]:
             # Collects the fastest 100 increasing fits for each security type
             fit_dict[f] = self.__data.sort_values(
                 f, ascending=False).groupby("type",
                                             as_index=False).head(100)
             fit_dict[f].index.name = f
-            fc = "%s category" % f
-            # Generate counts, means, and standard deviations for each category
-            fit_dict[fc] = self.__data.groupby("category").aggregate(a)
-            # Flatten the multi-level aggregate column names
-            fit_dict[fc].columns = [
-                " ".join(c).strip() for c in fit_dict[fc].columns.values]
-            fit_dict[fc] = fit_dict[fc][self.__options["aggregate_columns"]]
-            fit_dict[fc].sort_values("%s mean" % f, ascending=False,
-                                     inplace=True)
-        self.__logger.info("processed fits %s" % p)
+            fit_dict["%s category" % f] = category.sort_values(
+                "%s mean" % f, ascending=False)
+        self.__logger.info("processed fits %s", p)
         return fit_dict
 
     def generate_workbook(self, top_sorted, market, group_dict, fit_dict):
@@ -712,7 +852,7 @@ class SecuritiesAnalysis(object):
 
         """
         p = multiprocessing.current_process().name
-        self.__logger.info("generating workbook %s" % p)
+        self.__logger.info("generating workbook %s", p)
         # Generate a list of dataframes to populate the workbook
         results = [
             top_sorted, market, group_dict["category"], group_dict["family"],
@@ -720,15 +860,17 @@ class SecuritiesAnalysis(object):
         results.extend([fit_dict[f] for f in self.__options["fit_columns"]])
         results.extend([fit_dict["%s category" % f]
                         for f in self.__options["fit_columns"]])
+        # Flush each row to disk as it is written since the sheets are
+        # populated strictly in row order
         workbook = xlsxwriter.Workbook(
-            os.path.join(self.__report_path, "summary",
-                         "%s.xlsx" % str(self.__log_date)))
+            os.path.join(self.__summary_path,
+                         "%s.xlsx" % str(self.__log_date)),
+            {"constant_memory": True})
         # Iterate over the dataframe list to populate each workbook page
-        [securitiesanalysis.utilities.add_sheet(
-            workbook, h, r, self.__options["unquoted_comma_pattern"])
-            for h, r in zip(self.__options["result_headers"], results)]
+        [securitiesanalysis.utilities.add_sheet(workbook, h, r)
+         for h, r in zip(self.__options["result_headers"], results)]
         workbook.close()
-        self.__logger.info("generated workbook %s" % p)
+        self.__logger.info("generated workbook %s", p)
 
     def get_email_message(self):
         """
@@ -745,36 +887,65 @@ class SecuritiesAnalysis(object):
 
         """
         p = multiprocessing.current_process().name
-        self.__logger.info("getting email message for %s %s"
-                           % (str(self.__log_date), p))
+        log_date = str(self.__log_date)
+        workbook_name = "%s.xlsx" % log_date
+        self.__logger.info("getting email message for %s %s", log_date, p)
         email_address = self.__options["email_address"]
         summary_message = email.mime.multipart.MIMEMultipart()
-        summary_message["Subject"] = "market summary for %s" \
-                                     % str(self.__log_date)
+        summary_message["Subject"] = "market summary for %s" % log_date
         summary_message["From"] = email_address
         summary_message["To"] = email_address
         # Attach the summary workbook to the message
-        with codecs.open(os.path.join(
-                self.__report_path, "summary",
-                "%s.xlsx" % str(self.__log_date)), "rb") as summary_file:
+        with open(os.path.join(self.__summary_path, workbook_name),
+                  "rb") as summary_file:
             attachment = email.mime.application.MIMEApplication(
-                summary_file.read(), Name="%s.xlsx" % str(self.__log_date))
+                summary_file.read(),
+                _subtype="vnd.openxmlformats-officedocument."
+                         "spreadsheetml.sheet",
+                Name=workbook_name)
         attachment["Content-Disposition"] = \
-            "attachment; filename=\"%s.xlsx\"" % str(self.__log_date)
+            "attachment; filename=\"%s\"" % workbook_name
         summary_message.attach(
             email.mime.text.MIMEText("\n".join(self.__message_list)))
         summary_message.attach(attachment)
-        self.__logger.info("got email message for %s %s"
-                           % (str(self.__log_date), p))
+        self.__logger.info("got email message for %s %s", log_date, p)
         return summary_message
 
+    def connect_smtp(self):
+        """
+        Opens an authenticated session with the configured SMTP server.
+
+        Connects to the server, upgrades the connection to TLS, and logs in
+        with the configured email address so that messages can be sent.
+
+        Returns
+        -------
+        session : obj
+            SMTP session ready to send messages.
+
+        """
+        session = smtplib.SMTP(self.__options["smtp_host"],
+                               self.__options["smtp_port"])
+        try:
+            # Initialize the SMTP sever
+            session.ehlo()
+            session.starttls()
+            session.ehlo()
+            session.login(self.__options["email_address"],
+                          self.__options["email_password"])
+        except:
+            session.close()
+            raise
+        return session
+
     def email_results(self, summary_message):
         """
         Sends summary email to configured address.
 
         Delivers email containing list of recent splits, and unmapped
         categories encountered during processing, and summary workbook to
-        the recipient specified in the configuration file.
+        the recipient specified in the configuration file.  The SMTP session
+        is kept across retries unless the connection itself is lost.
 
         Parameters
         -------
@@ -784,43 +955,85 @@ class SecuritiesAnalysis(object):
 
         """
         p = multiprocessing.current_process().name
-        self.__logger.info("sending email for %s %s" % (str(self.__log_date),
-                                                        p))
+        log_date = str(self.__log_date)
+        self.__logger.info("sending email for %s %s", log_date, p)
         email_address = self.__options["email_address"]
+        # Serialize the message and its encoded attachment only once
+        message = summary_message.as_string()
         sent = False
         retry_count = 0
-        while not sent:
-            try:
-                s = smtplib.SMTP(self.__options["smtp_host"],
-                                 self.__options["smtp_port"])
-                # Initialize the SMTP sever
-                s.ehlo()
-                s.starttls()
-                s.ehlo()
-                s.login(email_address, self.__options["email_password"])
-                s.sendmail(email_address, [email_address],
-                           summary_message.as_string())
-                s.quit()
-                sent = True
-                self.__logger.info("sent email %s %s" % (str(self.__log_date),
-                                                         p))
-            except socket.error:
-                self.__logger.error(
-                    "socket error for sending email %s" % retry_count)
-                time.sleep(self.__options["delay_time"])
-            except smtplib.SMTPServerDisconnected:
-                self.__logger.error(
-                    "SMTP server disconnected error sending email %s"
-                    % retry_count)
-                time.sleep(self.__options["delay_time"])
-            except:
-                self.__logger.error(
-                    "generic error sending email %s" % retry_count)
-                retry_count += 1
-                if retry_count < self.__options["max_retry_count"]:
-                    time.sleep(self.__options["delay_time"])
-                else:
+        session = None
+        try:
+            while not sent and \
+                    retry_count < self.__options["max_retry_count"]:
+                try:
+                    # Only connect and authenticate when there is no session
+                    if session is None:
+                        session = self.connect_smtp()
+                    session.sendmail(email_address, [email_address], message)
                     sent = True
+                    self.__logger.info("sent email %s %s", log_date, p)
+                except smtplib.SMTPServerDisconnected as e:
+                    self.__logger.error(
+                        "SMTP server disconnected error sending email %s %s",
+                        retry_count,
+                        securitiesanalysis.utilities.format_error(e))
+                    # The connection is gone so reconnect on the next attempt
+                    session = None
+                except smtplib.SMTPResponseException as e:
+                    # The server rejected the message but the session remains
+                    # usable so it is kept for the next attempt
+                    self.__logger.error(
+                        "SMTP response error sending email %s %s", retry_count,
+                        securitiesanalysis.utilities.format_error(e))
+                except Exception as e:
+                    self.__logger.error(
+                        "error sending email %s %s", retry_count,
+                        securitiesanalysis.utilities.format_error(e))
+                    # Discard the session since its state is unknown
+                    if session is not None:
+                        session.close()
+                    session = None
+                if not sent:
+                    # Every failure counts towards the limit and waits longer
+                    # than the last one, up to the configured maximum
+                    retry_count += 1
+                    if retry_count < self.__options["max_retry_count"]:
+                        time.sleep(self.__get_email_backoff(retry_count))
+            if not sent:
+                self.__logger.error(
+                    "gave up sending email for %s after %s attempts %s",
+                    log_date, retry_count, p)
+        finally:
+            if session is not None:
+                try:
+                    session.quit()
+                except (smtplib.SMTPException, socket.error):
+                    session.close()
+
+    def __get_email_backoff(self, attempt):
+        """
+        Determines how long to wait before the next attempt to send email.
+
+        Triples rather than doubles the configured delay for each failed
+        attempt, up to the configured maximum email delay, since the email is
+        sent once at the end of the run and a mail server outage usually
+        outlasts a few scrape retries.
+
+        Parameters
+        ----------
+        attempt : int
+            Number of failed attempts so far.
+
+        Returns
+        -------
+        delay : float
+            Number of seconds to wait.
+
+        """
+        return securitiesanalysis.utilities.get_backoff(
+            attempt, self.__options["delay_time"],
+            self.__options["max_email_delay_time"], base=3)
 
     def remove_logs(self):
         """
@@ -831,25 +1044,22 @@ class SecuritiesAnalysis(object):
 
         """
         p = multiprocessing.current_process().name
-        self.__logger.info("removing logs %s" % p)
+        self.__logger.info("removing logs %s", p)
         keep_date = self.__log_date \
                     - datetime.timedelta(days=self.__options["log_keep_days"])
-        log_files = [os.path.join(self.__log_path, l)
-                     for l in os.listdir(self.__log_path)]
-        # Extract the file dates from the names
-        log_dates = {
-            datetime.datetime.strptime(
-                l.split("/")[-1][:-4],
-                "%Y-%m-%d").date(): l for l in log_files}
-        # Find the dates outside of the retention period
-        keep = [k for k in log_dates.keys() if keep_date < k]
+        # Find the log files dated outside of the retention period in a
+        # single pass over the directory
+        with os.scandir(self.__log_path) as entries:
+            removed_files = [
+                e.path for e in entries
+                if datetime.datetime.strptime(e.name[:-4],
+                                              "%Y-%m-%d").date() <= keep_date]
         # Delete the log files outside of the retention period
-        [os.remove(v) for k, v in log_dates.items() if k not in keep]
-        removed_files = [v for k, v in log_dates.items() if k not in keep]
-        self.__logger.info("deleted %s based on %s day threshold"
-                           % (str(removed_files),
-                              self.__options["log_keep_days"]))
-        self.__logger.info("removed logs %s" % p)
+        for r in removed_files:
+            os.remove(r)
+        self.__logger.info("deleted %s based on %s day threshold",
+                           removed_files, self.__options["log_keep_days"])
+        self.__logger.info("removed logs %s", p)
 
     def execute(self):
         """
@@ -869,15 +1079,13 @@ class SecuritiesAnalysis(object):
         d = self.__data.merge(
             self.get_summary_regression_coefficients(grouped_reports),
             how="left", left_index=True, right_index=True, sort=True)
-        self.__data = d[self.__options["column_order"]]
-        self.__data.to_csv(os.path.join(self.__report_path, "data",
+        # Cast the summary coefficients to match the other regression
+        # columns in memory rather than reading the saved dataframe back
+        self.__data = d[self.__options["column_order"]].astype(
+            dict.fromkeys(self.__options["column_order"][7:], numpy.float64))
+        self.__data.to_csv(os.path.join(self.__data_path,
                                         "%s.txt" % str(self.__log_date)),
-                           sep="|", encoding="utf-8")
-        # Read the previously saved dataframe to ensure correct column types
-        self.__data = pandas.read_csv(
-            os.path.join(self.__report_path, "data",
-                         "%s.txt" % str(self.__log_date)), sep="|",
-            header=0, names=self.__options["column_order"], index_col=0)
+                           sep="|", encoding="utf-8", float_format="%.6f")
         top_sorted, market, group_dict = self.aggregate()
         fit_dict = self.process_fits()
         self.generate_workbook(top_sorted, market, group_dict, fit_dict)
@@ -885,7 +1093,7 @@ class SecuritiesAnalysis(object):
             summary_message = self.get_email_message()
             self.email_results(summary_message)
         self.remove_logs()
-        self.__logger.info("finished update for %s" % str(self.__log_date))
+        self.__logger.info("finished update for %s", self.__log_date)
         self.__logger.handlers[0].close()
         # move the log file to the logs folder and rename to the current date
         shutil.move(self.__logger.handlers[0].baseFilename,
@@ -2,15 +2,10 @@
 """
 Contains utility functions for generic use elsewhere in package.
 
-Group of utility functions including error formatting, ordinal date generation,
-mapping of traditional market capitalization categories, fit function for
-nonlinear regression analysis, and adding a worksheet to an existing
-workbook along with a basic logging class.
-
-The nondemonic classes are simple wrappers to create the ability to instantiate
-nested concurrent pools of processes.  The Logger class is a simple means of
-prepending a formatted timestamp to messages before appending them to a
-configured path.
+Group of utility functions including error formatting, retry delays, ordinal
+date generation, parsing of abbreviated asset values, mapping of traditional
+market capitalization categories, fit function and Jacobian for nonlinear
+regression analysis, and adding a worksheet to an existing workbook.
 
 Notes
 -----
@@ -28,8 +23,17 @@ under the AGPLv3.
 
 """
 import calendar
-import multiprocessing.pool
-import re
+import math
+import random
+
+import numpy
+
+MAGNITUDES = {"K": 1000, "M": 1000000, "B": 1000000000, "T": 1000000000000}
+"""dictionary: Order of magnitude for each abbreviated asset suffix."""
+CAP_BOUNDS = (2000000000, 10000000000)
+"""tuple: Lower bounds of the mid and large market capitalizations."""
+CAP_NAMES = ("small", "mid", "large")
+"""tuple: Market capitalization categories between the bounds."""
 
 
 def format_error(error):
@@ -41,8 +45,8 @@ def format_error(error):
 
     Parameters
     ----------
-    error : tuple
-        Exception type, exception message, and traceback information.
+    error : obj
+        Exception caught during processing.
 
     Returns
     -------
@@ -50,7 +54,39 @@ def format_error(error):
         Formatted version of error with type and message.
 
     """
-    return "%s %s" % (error[0].__name__, error[1])
+    return "%s %s" % (type(error).__name__, error)
+
+
+def get_backoff(attempt, delay_time, max_delay_time, base=2):
+    """
+    Calculates the number of seconds to wait before the next retry.
+
+    Multiplies the delay by base for every failed attempt up to the maximum
+    delay and scales the result by a random factor between one half and one
+    so that concurrent callers do not retry in lockstep.  The maximum is
+    raised to the delay when set below it and no wait is ever shorter than
+    the delay.
+
+    Parameters
+    ----------
+    attempt : int
+        Number of failed attempts preceding the retry.
+    delay_time : int
+        Number of seconds to wait before the first retry.
+    max_delay_time : int
+        Maximum number of seconds to wait before any retry.
+    base : int
+        Factor the delay grows by with each failed attempt.
+
+    Returns
+    -------
+    float
+        Number of seconds to wait.
+
+    """
+    delay = min(max(max_delay_time, delay_time),
+                delay_time * base ** min(attempt, 32))
+    return max(delay_time, delay * (0.5 + random.random() / 2))
 
 
 def get_yearfrac(d):
@@ -76,33 +112,104 @@ def get_yearfrac(d):
            / (366 if calendar.isleap(d.year) else 365)
 
 
-def get_cap(assets):
+def get_assets(text):
+    """
+    Converts abbreviated asset text into an integer value.
+
+    Multiplies the numeric portion of the text by the order of magnitude
+    indicated by the trailing character, such as 1.5B for 1,500,000,000.
+
+    Parameters
+    ----------
+    text : str
+        Net assets with a trailing K, M, B, or T magnitude suffix.
+
+    Returns
+    -------
+    int
+        Net assets as a whole number, -1 if the suffix is not recognized.
+
+    """
+    magnitude = MAGNITUDES.get(text[-1])
+    return int(magnitude * float(text[:-1])) if magnitude else -1
+
+
+def get_yearfracs(dates):
+    """
+    Converts dates into floating point values for numerical comparison.
+
+    Vectorized form of get_yearfrac operating on every date at once.
+
+    Parameters
+    ----------
+    dates : obj
+        Dates to be converted into floating point values.
+
+    Returns
+    -------
+    array
+        Year of each date with day of the year as the fractional component.
+
+    """
+    return numpy.asarray(
+        dates.year + dates.dayofyear
+        / numpy.where(dates.is_leap_year, 366.0, 365.0), dtype=numpy.float64)
+
+
+def get_closest_indices(index, values):
+    """
+    Finds positions of the sorted index entries nearest to each value.
+
+    Locates every value with a single binary search and picks whichever
+    neighboring entry is closer, preferring the later entry on ties to match
+    pandas nearest index lookups.
+
+    Parameters
+    ----------
+    index : array
+        Sorted values to search.
+    values : array
+        Values to locate within the index.
+
+    Returns
+    -------
+    array
+        Position of the nearest index entry for each value.
+
+    """
+    if len(index) < 2:
+        return numpy.zeros(len(values), dtype=numpy.intp)
+    right = numpy.clip(numpy.searchsorted(index, values), 1, len(index) - 1)
+    left = right - 1
+    return numpy.where(
+        numpy.abs(index[left] - values) < numpy.abs(index[right] - values),
+        left, right)
+
+
+def get_caps(assets):
     """
-    Converts assets into corresponding market capitalization category.
+    Converts assets into corresponding market capitalization categories.
 
-    Returns the market capitalization category based on the provided net assets
-    or market capitalization value.
+    Returns the market capitalization category for each of the provided net
+    assets or market capitalization values, locating all of them within the
+    category bounds in a single search.
 
     Parameters
     ----------
-    assets : int
+    assets : array
         Net Assets of mutual funds or Exchange Traded Funds, market
-        capitalization of stocks.
+        capitalization of stocks, negative when not available.
 
     Returns
     -------
-    str
-        Formatted version of error with type and message.
+    array
+        "large", "mid", or "small" defined by greater than $10B, between $2B
+        and $10B, and less than $2B, or "UNKNOWN" for negative assets.
 
     """
-    if assets < 0:
-        return "UNKNOWN"
-    elif assets < 2000000000:
-        return "small"
-    elif assets < 10000000000:
-        return "mid"
-    else:
-        return "large"
+    names = numpy.array(("UNKNOWN",) + CAP_NAMES, dtype=object)
+    positions = numpy.searchsorted(CAP_BOUNDS, assets, side="right") + 1
+    return names[numpy.where(numpy.asarray(assets) < 0, 0, positions)]
 
 
 def func(x, a, b):
@@ -115,7 +222,7 @@ def func(x, a, b):
 
     Parameters
     ----------
-    x : float
+    x : float or array
         Independent variable of non linear regression fit.
     a : float
         First coefficient of non linear regression fit.
@@ -124,7 +231,7 @@ def func(x, a, b):
 
     Returns
     -------
-    float
+    float or array
         Value of a * b ^ x.
 
     See Also
@@ -136,86 +243,92 @@ def func(x, a, b):
     return a * pow(b, x)
 
 
-def add_sheet(workbook, name, frame, split_pattern):
+def jac(x, a, b):
     """
-    Places a new spreadsheet in workbook and populates with dataframe values.
+    Jacobian of the model function for non linear regression fit.
 
-    Adds a sheet to an existing Excel compatible workbook inserting values
-    from a dataframe into rows and columns as needed.
+    Partial derivatives of a * b ^ x with respect to the a and b coefficients
+    supplied to scipy.optimize.curve_fit so that they are not estimated by
+    finite differences.
 
     Parameters
     ----------
-    workbook : obj
-        Representation of an Excel compatible workbook.
-    name : str
-        Title of spreadsheet.
-    frame : obj
-        Data to be iterated over and populate the spreadsheet.
-    split_pattern : str
-        Regular expression to separate values in each data frame row.
-
-    """
-    worksheet = workbook.add_worksheet(name)
-    row = 0
-    # Iterate over the dataframe rows
-    for line in [re.split(split_pattern, f) for f in
-                 frame.to_csv().split("\n")[:-1]]:
-        column = 0
-        # Iterate over the columns of each row
-        for value in line:
-            # Populate the cell with the corresponding value from the dataframe
-            worksheet.write(row, column, value)
-            column += 1
-        row += 1
+    x : array
+        Independent variable of non linear regression fit.
+    a : float
+        First coefficient of non linear regression fit.
+    b : float
+        Second coefficient of non linear regression fit.
 
+    Returns
+    -------
+    array
+        Values of b ^ x and a * x * b ^ (x - 1) for each x.
 
-class NonDaemonicProcess(multiprocessing.Process):
     """
-    Process class limited to non daemonic state.
+    return numpy.column_stack([numpy.power(b, x),
+                               a * x * numpy.power(b, x - 1)])
 
-    Extension of multiprocessing.Process with the daemon property modified to
-    return false in all cases.
 
+def get_fit_errors(actual, predict):
     """
+    Goodness of fit measures for predicted values.
 
-    @property
-    def daemon(self):
-        """boolean: Explicitly restrict processes to be nondaemonic."""
-        return False
+    Computes the residuals once and derives both the coefficient of
+    determination and the root mean squared error from their sum of squares.
+    A constant series yields 1 for a perfect prediction and 0 otherwise.
 
-    @daemon.setter
-    def daemon(self, value):
-        pass
+    Parameters
+    ----------
+    actual : array
+        Observed values of the dependent variable.
+    predict : array
+        Values of the dependent variable predicted by the fit.
 
+    Returns
+    -------
+    r2 : float
+        Coefficient of determination for predicted values.
+    rmse : float
+        Root mean square error of predicted values.
 
-class NonDaemonicContext(type(multiprocessing.get_context())):
     """
-    Minimal context wrapping nondaemonic processes.
+    residuals = actual - predict
+    sse = residuals @ residuals
+    deviations = actual - actual.mean()
+    sst = deviations @ deviations
+    if sst == 0:
+        r2 = 1.0 if sse == 0 else 0.0
+    else:
+        r2 = 1.0 - sse / sst
+    return r2, math.sqrt(sse / len(actual))
 
-    Multiprocessing context that uses the NonDaemonicProcess class to create a
-    pool containing only nondaemonic processes.
 
+def add_sheet(workbook, name, frame):
     """
+    Places a new spreadsheet in workbook and populates with dataframe values.
 
-    Process = NonDaemonicProcess
-    """obj: Processes for pool limited to nondaemonic state."""
-
-
-class NonDaemonicPool(multiprocessing.pool.Pool):
-    """
-    Minimal pool wrapping nondaemonic processes.
+    Adds a sheet to an existing Excel compatible workbook writing the index
+    and column names followed by one row per dataframe record, with missing
+    and infinite values left as blank cells.
 
-    Extension of multiprocessing.pool.Pool that uses the NonDaemonContext
-    class to create a nestable pool containing only nondaemonic processes.
+    Parameters
+    ----------
+    workbook : obj
+        Representation of an Excel compatible workbook.
+    name : str
+        Title of spreadsheet.
+    frame : obj
+        Data to be iterated over and populate the spreadsheet.
 
     """
-
-    def __init__(self, *args, **kwargs):
-        """
-        Prepares all needed instance variables for execution.
-
-        Adds the nondemonic context to allow for nesting of pools.
-
-        """
-        kwargs["context"] = NonDaemonicContext()
-        super(NonDaemonicPool, self).__init__(*args, **kwargs)
+    worksheet = workbook.add_worksheet(name)
+    # Populate the header with the index name and the column names
+    worksheet.write_row(0, 0, [frame.index.name or ""]
+                        + [str(c) for c in frame.columns])
+    # Blank out the values which cannot be stored as numbers
+    frame = frame.replace([numpy.inf, -numpy.inf], numpy.nan)
+    frame = frame.astype(object).where(frame.notna(), None)
+    # Populate each row with the index value and the record values
+    for row, values in enumerate(frame.itertuples(name=None), start=1):
+        worksheet.write_row(row, 0, values)
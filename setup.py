@@ -8,7 +8,7 @@ stocks. The analysis is based on daily closing prices and is designed to be
 executed after market close via a cron job or equivalent scheduler.  All
 configuration parameters are specified in the options.json file located in the
 installation folder under the data subdirectory.  The package utilizes NumPy,
-Pandas, Requests, Scikit-learn, SciPy, and XlsxWriter.
+Pandas, Requests, SciPy, and XlsxWriter.
 
 Example
 -------
@@ -50,13 +50,12 @@ result = setuptools.setup(
             "securities-analysis=securitiesanalysis.__main__:main"
         ]
     },
-    python_requires=">3.6",
+    python_requires=">=3.7",
     install_requires=[
         "numpy>=1.19.2",
         "pandas>=1.1.5",
         "pandas_market_calendars>=4.0.1",
         "requests>=2.25.1",
-        "scikit-learn>=0.23.2",
         "scipy>=1.5.2",
         "xlsxwriter>=1.3.7"
     ],
@@ -73,7 +72,7 @@ result = setuptools.setup(
         "Intended Audience :: Financial and Insurance Industry",
         "License :: OSI Approved :: GNU Affero General Public License v3",
         "Operating System :: POSIX :: Linux",
-        "Programming Language :: Python :: 3.6",
+        "Programming Language :: Python :: 3.7",
         "Topic :: Office/Business :: Financial :: Investment",
         "Topic :: Scientific/Engineering :: Mathematics"
     ]
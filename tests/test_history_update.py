@@ -0,0 +1,69 @@
+"""
+Tests for the stored split keys of the history update.
+
+Notes
+-----
+Securities Analysis is distributed under the GNU Affero General Public License
+v3 (https://www.gnu.org/licenses/agpl.html) as open source software with
+attribution required.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU Affero General Public License v3
+(https://www.gnu.org/licenses/agpl.html) for more details.
+
+Copyright (C) 2024 John Sonsini.  All rights reserved.  Source code available
+under the AGPLv3.
+
+"""
+import datetime
+import json
+import os
+import unittest
+
+import numpy
+import pandas
+
+import securitiesanalysis.history_update
+import securitiesanalysis.utilities
+
+
+class SplitTest(unittest.TestCase):
+    """
+    Checks that applied splits survive being saved to the options file.
+
+    """
+
+    def test_shipped_splits_round_trip(self):
+        """
+        Verifies every shipped split is written back unchanged.
+
+        """
+        with open(os.path.join(os.path.dirname(
+                securitiesanalysis.history_update.__file__), "data",
+                "options.json")) as options_file:
+            splits = json.load(options_file)["applied_split_set"]
+        self.assertEqual(
+            [securitiesanalysis.history_update.format_split(
+                securitiesanalysis.history_update.parse_split(s))
+             for s in splits], splits)
+
+    def test_scraped_split_round_trip(self):
+        """
+        Verifies a split built from scraped values matches once read back.
+
+        """
+        split_date = numpy.round(securitiesanalysis.utilities.get_yearfracs(
+            pandas.to_datetime(["2024-06-28"], format="%Y-%m-%d")), 6)[0]
+        split = ("ABC", float("1"), float("15"), split_date)
+        text = securitiesanalysis.history_update.format_split(split)
+        self.assertEqual(text, "ABC 1.0 15.0 %s" % split_date)
+        self.assertEqual(
+            securitiesanalysis.history_update.parse_split(text), split)
+        self.assertEqual(split_date, round(
+            securitiesanalysis.utilities.get_yearfrac(
+                datetime.date(2024, 6, 28)), 6))
+
+
+if __name__ == "__main__":
+    unittest.main()
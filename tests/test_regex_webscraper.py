@@ -0,0 +1,174 @@
+"""
+Tests for the retry handling of the regular expression web scraper.
+
+Notes
+-----
+Securities Analysis is distributed under the GNU Affero General Public License
+v3 (https://www.gnu.org/licenses/agpl.html) as open source software with
+attribution required.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU Affero General Public License v3
+(https://www.gnu.org/licenses/agpl.html) for more details.
+
+Copyright (C) 2024 John Sonsini.  All rights reserved.  Source code available
+under the AGPLv3.
+
+"""
+import unittest
+import unittest.mock
+
+import requests
+
+import securitiesanalysis.regex_webscraper
+
+
+def _response(status_code, text="", headers=None):
+    """
+    Builds a response as returned by the HTTP session.
+
+    Parameters
+    ----------
+    status_code : int
+        HTTP status code of the response.
+    text : str
+        Body of the response.
+    headers : dictionary
+        Response headers.
+
+    Returns
+    -------
+    obj
+        Response with the passed in status, body, and headers.
+
+    """
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = text.encode("utf-8")
+    response.headers.update(headers or dict())
+    response.url = "http://example.com/"
+    return response
+
+
+class ScrapeTest(unittest.TestCase):
+    """
+    Drives the scrape retry loop with canned responses.
+
+    """
+
+    def setUp(self):
+        """
+        Replaces the session requests and the waits between retries.
+
+        """
+        self.__get = unittest.mock.patch.object(requests.Session, "get")
+        self.__sleep = unittest.mock.patch("time.sleep")
+        self.get = self.__get.start()
+        self.sleep = self.__sleep.start()
+
+    def tearDown(self):
+        """
+        Restores the session requests and the waits between retries.
+
+        """
+        self.__get.stop()
+        self.__sleep.stop()
+
+    def __scraper(self, **kwargs):
+        """
+        Creates a scraper matching two digit numbers.
+
+        Parameters
+        ----------
+        **kwargs
+            Options passed on to the scraper.
+
+        Returns
+        -------
+        obj
+            Scraper allowing five attempts with a one second delay.
+
+        """
+        return securitiesanalysis.regex_webscraper.RegexWebScraper(
+            [r"\d\d"], 1, 1, 5, **kwargs)
+
+    def test_success(self):
+        """
+        Verifies a loaded page is matched without any retry.
+
+        """
+        self.get.return_value = _response(200, "a 12 b 34")
+        self.assertEqual(self.__scraper().scrape("url"), ["12"])
+        self.assertEqual(self.__scraper(findall=True).scrape("url"),
+                         [["12", "34"]])
+        self.sleep.assert_not_called()
+
+    def test_retry_status(self):
+        """
+        Verifies rate limiting and server errors are retried.
+
+        """
+        self.get.side_effect = [_response(503), _response(429),
+                                _response(200, "56")]
+        self.assertEqual(self.__scraper().scrape("url"), ["56"])
+        self.assertEqual(self.get.call_count, 3)
+        self.assertEqual(self.sleep.call_count, 2)
+
+    def test_retry_after(self):
+        """
+        Verifies the wait requested by the server is honored.
+
+        """
+        self.get.side_effect = [_response(503, headers={"Retry-After": "7"}),
+                                _response(200, "56")]
+        self.assertEqual(self.__scraper(max_delay_time=10).scrape("url"),
+                         ["56"])
+        self.sleep.assert_called_once_with(7)
+
+    def test_no_retry_status(self):
+        """
+        Verifies other error responses return the defaults immediately.
+
+        """
+        self.get.return_value = _response(404)
+        self.assertEqual(self.__scraper().scrape("url"), [None])
+        self.assertEqual(self.__scraper(findall=True).scrape("url"), [[]])
+        self.assertEqual(self.get.call_count, 2)
+        self.sleep.assert_not_called()
+
+    def test_retries_exhausted(self):
+        """
+        Verifies connection errors stop after the maximum attempts.
+
+        """
+        self.get.side_effect = requests.exceptions.ConnectionError()
+        self.assertEqual(self.__scraper(findall=True).scrape("url"), [[]])
+        self.assertEqual(self.get.call_count, 5)
+        self.assertEqual(self.sleep.call_count, 4)
+
+    def test_retry_time_exhausted(self):
+        """
+        Verifies no retry is made once the next wait exceeds the budget.
+
+        """
+        self.get.side_effect = requests.exceptions.ReadTimeout()
+        scraper = securitiesanalysis.regex_webscraper.RegexWebScraper(
+            [r"\d\d"], 1, 60, 5, max_retry_time=30)
+        self.assertEqual(scraper.scrape("url"), [None])
+        self.assertEqual(self.get.call_count, 1)
+        self.sleep.assert_not_called()
+
+    def test_interrupt(self):
+        """
+        Verifies an interrupt is raised rather than retried.
+
+        """
+        self.get.side_effect = KeyboardInterrupt()
+        with self.assertRaises(KeyboardInterrupt):
+            self.__scraper().scrape("url")
+        self.sleep.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
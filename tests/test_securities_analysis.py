@@ -0,0 +1,176 @@
+"""
+Regression tests for the securities analysis.
+
+Notes
+-----
+Securities Analysis is distributed under the GNU Affero General Public License
+v3 (https://www.gnu.org/licenses/agpl.html) as open source software with
+attribution required.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU Affero General Public License v3
+(https://www.gnu.org/licenses/agpl.html) for more details.
+
+Copyright (C) 2024 John Sonsini.  All rights reserved.  Source code available
+under the AGPLv3.
+
+"""
+import datetime
+import json
+import logging
+import os
+import tempfile
+import threading
+import unittest
+
+import numpy
+import pandas
+
+import securitiesanalysis.securities_analysis
+import securitiesanalysis.utilities
+
+
+class RegressionCoefficientsTest(unittest.TestCase):
+    """
+    Runs the analysis process pool with worker logging enabled.
+
+    """
+
+    def setUp(self):
+        """
+        Creates an analysis instance logging to a temporary file.
+
+        Every security is given only two days of history so that each worker
+        logs and returns without fitting any period.
+
+        """
+        with open(os.path.join(os.path.dirname(
+                securitiesanalysis.securities_analysis.__file__), "data",
+                "options.json")) as options_file:
+            options = json.load(options_file)
+        options["analysis_pool_size"] = 4
+        self.__directory = tempfile.TemporaryDirectory()
+        history_path = os.path.join(self.__directory.name, "history")
+        os.makedirs(history_path)
+        self.__symbols = ["S%03d" % i for i in range(200)]
+        for symbol in self.__symbols:
+            with open(os.path.join(history_path, "%s.txt" % symbol),
+                      "w") as history_file:
+                history_file.write("2024-06-27 10.0\n2024-06-28 10.5\n")
+        self.__log_file = os.path.join(self.__directory.name, "test.log")
+        self.__handler = logging.FileHandler(self.__log_file)
+        self.__logger = logging.getLogger("test_securities_analysis")
+        self.__logger.setLevel(logging.INFO)
+        self.__logger.addHandler(self.__handler)
+        self.__data = pandas.DataFrame(
+            index=pandas.Index(self.__symbols, name="symbol"))
+        self.__analysis = securitiesanalysis.securities_analysis.\
+            SecuritiesAnalysis(self.__directory.name, options, self.__data,
+                               list(), datetime.date(2024, 6, 28),
+                               self.__logger)
+
+    def tearDown(self):
+        """
+        Detaches the log handler and removes the temporary directory.
+
+        """
+        self.__logger.removeHandler(self.__handler)
+        self.__handler.close()
+        self.__directory.cleanup()
+
+    def test_get_regression_coefficients_with_logging(self):
+        """
+        Verifies repeated pools return every result without hanging.
+
+        """
+        runs = 5
+        for _ in range(runs):
+            # Run the pool on a daemon thread so a hang fails the test
+            thread = threading.Thread(
+                target=self.__analysis.get_regression_coefficients,
+                daemon=True)
+            thread.start()
+            thread.join(60)
+            self.assertFalse(thread.is_alive(), "process pool did not exit")
+        self.assertEqual(list(self.__data.index), self.__symbols)
+        self.assertTrue(self.__data["1YA"].isna().all())
+        self.assertTrue(self.__data["3YF"].isna().all())
+        # Each run logs its start and end in the parent and two lines for
+        # every security in the workers
+        with open(self.__log_file) as log_file:
+            self.assertEqual(len(log_file.readlines()),
+                             runs * (2 + 2 * len(self.__symbols)))
+
+
+class SummaryRegressionCoefficientsTest(unittest.TestCase):
+    """
+    Checks the precision of the stored summary trends.
+
+    """
+
+    def setUp(self):
+        """
+        Creates an analysis instance and a year of coefficient reports.
+
+        """
+        with open(os.path.join(os.path.dirname(
+                securitiesanalysis.securities_analysis.__file__), "data",
+                "options.json")) as options_file:
+            options = json.load(options_file)
+        options["analysis_pool_size"] = 2
+        self.__directory = tempfile.TemporaryDirectory()
+        self.__logger = logging.getLogger("test_securities_analysis_summary")
+        self.__logger.addHandler(logging.NullHandler())
+        self.__analysis = securitiesanalysis.securities_analysis.\
+            SecuritiesAnalysis(self.__directory.name, options, None, list(),
+                               datetime.date(2024, 6, 28), self.__logger)
+        dates = securitiesanalysis.utilities.get_yearfracs(
+            pandas.date_range(datetime.date(2023, 6, 1),
+                              datetime.date(2024, 6, 28), freq="B"))
+        columns = options["process_summary_columns"]
+        random = numpy.random.default_rng(0)
+        # Coefficients grow slowly with noise like the daily fits they model
+        self.__reports = [
+            ("S%03d" % i, pandas.DataFrame(
+                1 + random.uniform(0, 0.5, len(columns))
+                * (dates - dates[0])[:, None]
+                + random.normal(0, 0.01, (len(dates), len(columns))),
+                index=pandas.Index(dates, name="date"), columns=columns))
+            for i in range(10)]
+
+    def tearDown(self):
+        """
+        Removes the temporary directory.
+
+        """
+        self.__directory.cleanup()
+
+    def test_float32_round_trip(self):
+        """
+        Verifies the written trends match the float64 values to 6 decimals.
+
+        """
+        results = self.__analysis.get_summary_regression_coefficients(
+            list(self.__reports))
+        self.assertTrue((results.dtypes == numpy.float32).all())
+        # Calculate the same trends at full precision in this process
+        expected = dict()
+        for report in self.__reports:
+            symbol, actual, fit = self.__analysis.process_summary(report)
+            expected[symbol] = numpy.stack([actual, fit], axis=-1).ravel()
+        expected = pandas.DataFrame.from_dict(
+            expected, orient="index", columns=results.columns)
+        path = os.path.join(self.__directory.name, "summary.txt")
+        results.to_csv(path, sep="|", float_format="%.6f")
+        written = pandas.read_csv(
+            path, sep="|", index_col=0,
+            dtype=dict.fromkeys(results.columns, numpy.float64))
+        self.assertEqual(list(written.index), list(expected.index))
+        self.assertFalse(written.isna().any().any())
+        numpy.testing.assert_array_almost_equal(
+            written.to_numpy(), expected.to_numpy(), decimal=6)
+
+
+if __name__ == "__main__":
+    unittest.main()
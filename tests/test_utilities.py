@@ -0,0 +1,104 @@
+"""
+Tests for the generic utility functions.
+
+Notes
+-----
+Securities Analysis is distributed under the GNU Affero General Public License
+v3 (https://www.gnu.org/licenses/agpl.html) as open source software with
+attribution required.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU Affero General Public License v3
+(https://www.gnu.org/licenses/agpl.html) for more details.
+
+Copyright (C) 2024 John Sonsini.  All rights reserved.  Source code available
+under the AGPLv3.
+
+"""
+import math
+import unittest
+
+import numpy
+import pandas
+
+import securitiesanalysis.utilities
+
+
+class UtilitiesTest(unittest.TestCase):
+    """
+    Checks the vectorized helpers against their scalar definitions.
+
+    """
+
+    def test_get_assets(self):
+        """
+        Verifies abbreviated assets expand by their magnitude suffix.
+
+        """
+        get_assets = securitiesanalysis.utilities.get_assets
+        self.assertEqual(get_assets("512K"), 512000)
+        self.assertEqual(get_assets("1.5B"), 1500000000)
+        self.assertEqual(get_assets("2.25T"), 2250000000000)
+        self.assertEqual(get_assets("10"), -1)
+
+    def test_get_caps(self):
+        """
+        Verifies the category bounds match the documented thresholds.
+
+        """
+        caps = securitiesanalysis.utilities.get_caps(numpy.array(
+            [-1, 0, 1999999999, 2000000000, 9999999999, 10000000000]))
+        self.assertEqual(list(caps), ["UNKNOWN", "small", "small", "mid",
+                                      "mid", "large"])
+
+    def test_get_closest_indices(self):
+        """
+        Verifies the nearest positions match pandas nearest index lookups.
+
+        """
+        index = numpy.array([2020.1, 2020.5, 2021.0, 2021.25, 2022.0])
+        values = numpy.array([2019.0, 2020.3, 2020.75, 2021.1, 2021.625,
+                              2023.0, 2021.25])
+        expected = pandas.Index(index).get_indexer(values, method="nearest")
+        numpy.testing.assert_array_equal(
+            securitiesanalysis.utilities.get_closest_indices(index, values),
+            expected)
+        numpy.testing.assert_array_equal(
+            securitiesanalysis.utilities.get_closest_indices(
+                index[:1], values), numpy.zeros(len(values)))
+
+    def test_get_fit_errors(self):
+        """
+        Verifies the coefficient of determination and root mean squared error.
+
+        """
+        get_fit_errors = securitiesanalysis.utilities.get_fit_errors
+        actual = numpy.array([1.0, 2.0, 3.0, 4.0])
+        self.assertEqual(get_fit_errors(actual, actual), (1.0, 0.0))
+        r2, rmse = get_fit_errors(actual, actual + [0.5, -0.5, 0.5, -0.5])
+        self.assertAlmostEqual(r2, 1 - 1.0 / 5.0)
+        self.assertAlmostEqual(rmse, 0.5)
+        constant = numpy.full(3, 2.0)
+        self.assertEqual(get_fit_errors(constant, constant), (1.0, 0.0))
+        r2, rmse = get_fit_errors(constant, constant + 1)
+        self.assertEqual(r2, 0.0)
+        self.assertTrue(math.isclose(rmse, 1.0))
+
+    def test_get_backoff(self):
+        """
+        Verifies the delay grows by the base within its bounds.
+
+        """
+        get_backoff = securitiesanalysis.utilities.get_backoff
+        for attempt in range(8):
+            delay = get_backoff(attempt, 60, 900)
+            self.assertGreaterEqual(delay, 60)
+            self.assertLessEqual(delay, min(900, 60 * 2 ** attempt))
+        self.assertEqual(get_backoff(5, 60, 30), 60)
+        self.assertLessEqual(get_backoff(1, 60, 1800, base=3), 180)
+        self.assertGreaterEqual(get_backoff(2, 60, 1800, base=3), 270)
+
+
+if __name__ == "__main__":
+    unittest.main()